@@ -1,8 +1,10 @@
 from fastapi import Request, HTTPException, Depends, status
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
-from app.database import get_db
-from app.services.auth_service import get_current_user, check_user_permission
+from app.database import get_db, get_async_db
+from app.services.auth_service import get_current_user, get_current_user_async, check_user_permission
+from app.services.permission_service import permission_registry
 
 def get_token_from_header(request: Request) -> Optional[str]:
     authorization: str = request.headers.get("Authorization")
@@ -30,11 +32,27 @@ async def get_current_active_user(
         
     user = get_current_user(db, token)
     if not user:
-        user = get_current_user(db, token)
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED
-            )
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+        )
+    if not user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return user
+
+async def get_current_active_user_async(
+    db: AsyncSession = Depends(get_async_db),
+    token: str = Depends(get_token_from_header)
+):
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Autheticate": "Bearer"},
+        )
+        
+    user = await get_current_user_async(db, token)
+    if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication credentials",
@@ -52,6 +70,8 @@ def require_role(required_role: str):
     return role_checker
 
 def require_permission(required_permissions: list):
+    permission_registry.mask_for(required_permissions)
+    
     def permission_checker(
         user = Depends(get_current_active_user)
     ):
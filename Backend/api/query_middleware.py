@@ -0,0 +1,166 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.database import DEBUG
+
+logger = logging.getLogger(__name__)
+
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+SLOW_STATEMENT_PREVIEW = 200
+
+
+class RequestQueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.statements = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def repeated_statements(self) -> Dict[str, int]:
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= N_PLUS_ONE_THRESHOLD
+        }
+
+
+class RouteQueryMetrics:
+    def __init__(self):
+        self._routes: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, stats: RequestQueryStats, repeated: Dict[str, int]) -> None:
+        with self._lock:
+            metrics = self._routes.setdefault(route, {
+                "requests": 0,
+                "queries": 0,
+                "db_time_ms": 0.0,
+                "max_queries": 0,
+                "slowest_ms": 0.0,
+                "slowest_statement": None,
+                "n_plus_one_requests": 0,
+            })
+            metrics["requests"] += 1
+            metrics["queries"] += stats.count
+            metrics["db_time_ms"] += stats.total_time * 1000
+            metrics["max_queries"] = max(metrics["max_queries"], stats.count)
+            if stats.slowest_time * 1000 > metrics["slowest_ms"]:
+                metrics["slowest_ms"] = stats.slowest_time * 1000
+                metrics["slowest_statement"] = (stats.slowest_statement or "")[:SLOW_STATEMENT_PREVIEW]
+            if repeated:
+                metrics["n_plus_one_requests"] += 1
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            result = {}
+            for route, metrics in self._routes.items():
+                requests = metrics["requests"]
+                result[route] = dict(
+                    metrics,
+                    db_time_ms=round(metrics["db_time_ms"], 3),
+                    slowest_ms=round(metrics["slowest_ms"], 3),
+                    avg_queries=round(metrics["queries"] / requests, 2) if requests else 0.0,
+                    avg_db_time_ms=round(metrics["db_time_ms"] / requests, 3) if requests else 0.0,
+                )
+            return result
+
+
+_request_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+route_query_metrics = RouteQueryMetrics()
+
+
+# The start time lives on the per-execution context rather than on the
+# pooled connection, so a statement that raises leaves nothing behind.
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    stats = _request_stats.get()
+    if started is not None and stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def get_route_name(request: Request) -> str:
+    route = request.scope.get("route")
+    path = getattr(route, "path", None) or request.url.path
+    return f"{request.method} {path}"
+
+
+def finish_request(route: str, stats: RequestQueryStats) -> None:
+    repeated = stats.repeated_statements()
+    route_query_metrics.record(route, stats, repeated)
+
+    for statement, count in repeated.items():
+        logger.warning(
+            "Possible N+1 on %s: statement ran %d times: %s",
+            route, count, statement[:SLOW_STATEMENT_PREVIEW]
+        )
+
+
+async def instrument_queries(request: Request, call_next):
+    """
+    Count the queries a request runs and record them against its route.
+
+    The route metrics are recorded once the response body has been sent,
+    so queries issued while a ``StreamingResponse`` generates its body
+    (the streaming exports) count towards the request that started it.
+    The debug headers go out before the body and only cover the queries
+    run up to that point.
+    """
+    stats = RequestQueryStats()
+    token = _request_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _request_stats.reset(token)
+
+    route = get_route_name(request)
+    if DEBUG:
+        repeated = stats.repeated_statements()
+        response.headers["X-DB-Query-Count"] = str(stats.count)
+        response.headers["X-DB-Time-Ms"] = f"{stats.total_time * 1000:.3f}"
+        response.headers["X-DB-Slowest-Ms"] = f"{stats.slowest_time * 1000:.3f}"
+        if repeated:
+            response.headers["X-DB-N-Plus-One"] = str(len(repeated))
+
+    body = getattr(response, "body_iterator", None)
+    if body is None:
+        finish_request(route, stats)
+        return response
+
+    async def finish_after_body():
+        try:
+            async for chunk in body:
+                yield chunk
+        finally:
+            finish_request(route, stats)
+
+    response.body_iterator = finish_after_body()
+    return response
+
+
+def get_query_metrics() -> Dict[str, dict]:
+    return route_query_metrics.snapshot()
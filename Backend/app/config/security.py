@@ -1,8 +1,7 @@
 import os
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Optional, Dict
-from jose import JWTError, jwt
-from passlib.context import CryptContext
 from dotenv import load_dotenv
 from datetime import UTC
 
@@ -18,24 +17,38 @@ class SecurityConfig:
     JWT_ACCESS_TOKEN_EXPIRES = int(os.environ.get('ACCESS_TOKEN_EXPIRE_MINUTES', 1440))
     BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
     
+    HASH_WORKERS = int(os.environ.get('HASH_WORKERS', os.cpu_count() or 2))
+    HASH_MAX_CONCURRENCY = int(os.environ.get('HASH_MAX_CONCURRENCY', os.cpu_count() or 2))
+    HASH_MAX_QUEUE = int(os.environ.get('HASH_MAX_QUEUE', 100))
+    HASH_START_METHOD = os.environ.get('HASH_START_METHOD', 'forkserver' if os.name == 'posix' else 'spawn')
+    
+    TOKEN_CACHE_TTL_SECONDS = int(os.environ.get('TOKEN_CACHE_TTL_SECONDS', 60))
+    TOKEN_CACHE_MAX_SIZE = int(os.environ.get('TOKEN_CACHE_MAX_SIZE', 10000))
+    
     SESSION_COOKIE_SECURE = os.environ.get('FLASK_ENV') == 'production'
     SESSION_COOKIE_HTTPONLY = True
     SESSION_COOKIE_SAMESITE = "Lax"
     
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000'). split(',')
 
-pwd_context = CryptContext (
-    schemes= ["bcrypt"],
-    depreated="auto",
-    rounds=SecurityConfig.BCRYPT_LOG_ROUNDS
-)
+@lru_cache(maxsize=None)
+def get_pwd_context():
+    from passlib.context import CryptContext
+    
+    return CryptContext (
+        schemes= ["bcrypt"],
+        depreated="auto",
+        rounds=SecurityConfig.BCRYPT_LOG_ROUNDS
+    )
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -> str:
+    from jose import jwt
+    
     to_encode = data.copy()
     
     expire = datetime.now(UTC) + (expires_delta or timedelta(minutes=SecurityConfig.JWT_ACCESS_TOKEN_EXPIRES))
@@ -51,6 +64,8 @@ def create_access_token(data: Dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
   
 def verify_token(token: str) -> Optional[Dict]:
+    from jose import JWTError, jwt
+    
     try:
         payload = jwt.decode(
             token,
@@ -1,7 +1,14 @@
+import functools
 import os
-from typing import Generator
+import sys
+import threading
+import time
+from collections import deque
+from typing import AsyncGenerator, Generator
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.orm import declarative_base, sessionmaker, Session
 from contextlib import contextmanager
 
@@ -11,64 +18,203 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=os.getenv("DEBUG", "FALSE").lower() in ("true", "1", "t")
-)
+DEBUG = os.getenv("DEBUG", "FALSE").lower() in ("true", "1", "t")
+DB_ASYNC_MODE = os.getenv("DB_ASYNC_MODE", "FALSE").lower() in ("true", "1", "t")
 
-SessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=engine
-)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
 
-Base = declarative_base()
+def get_async_database_url(url: str) -> str:
+    explicit = os.getenv("ASYNC_DATABASE_URL")
+    if explicit:
+        return explicit
 
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for database backend '{backend}'")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
 
-DATABASE_URL = os.getenv(
-    "DATABASE_URL",
-    "postgresql: //username:password@localhost:5432/Ginko_erp_system"
-)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "TRUE").lower() in ("true", "1", "t")
+DB_POOL_RESET_ON_RETURN = os.getenv("DB_POOL_RESET_ON_RETURN", "rollback").lower()
+DB_POOL_STATS_SAMPLES = int(os.getenv("DB_POOL_STATS_SAMPLES", 1000))
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if DB_POOL_RESET_ON_RETURN not in ("rollback", "commit", "none"):
+    raise ValueError("DB_POOL_RESET_ON_RETURN must be one of: rollback, commit, none")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300,
-    echo=os.getenv("DEBUG", "False").lower() == "true"
-)
+class PoolStats:
+    def __init__(self, max_samples: int):
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=max_samples)
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.invalidated = 0
 
-Base = declarative_base()
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self._waits.append(seconds)
+            self.checkouts += 1
+            self.total_wait += seconds
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finaly: #
-db.close
+    def record_invalidation(self) -> None:
+        with self._lock:
+            self.invalidated += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts = self.checkouts
+            total_wait = self.total_wait
+            invalidated = self.invalidated
+
+        p99 = waits[min(len(waits) - 1, int(len(waits) * 0.99))] if waits else 0.0
+        return {
+            "checkouts": checkouts,
+            "avg_checkout_wait_ms": round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+            "p99_checkout_wait_ms": round(p99 * 1000, 3),
+            "invalidated_connections": invalidated,
+        }
+
+pool_stats = PoolStats(DB_POOL_STATS_SAMPLES)
+
+class InstrumentedQueuePool(QueuePool):
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_stats.record_wait(time.perf_counter() - started)
+
+def get_engine_options(url: str = DATABASE_URL) -> dict:
+    options = {
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_reset_on_return": None if DB_POOL_RESET_ON_RETURN == "none" else DB_POOL_RESET_ON_RETURN,
+        "echo": DEBUG,
+    }
+    if make_url(url).get_backend_name() != "sqlite":
+        options.update(
+            poolclass=InstrumentedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    return options
+
+engine = create_engine(DATABASE_URL, **get_engine_options())
+
+@event.listens_for(engine, "invalidate")
+def _count_invalidation(dbapi_connection, connection_record, exception):
+    pool_stats.record_invalidation()
+
+def get_pool_stats() -> dict:
+    pool = engine.pool
+    stats = {
+        "pool_class": type(pool).__name__,
+        "pool_size": pool.size() if hasattr(pool, "size") else None,
+        "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+        "checked_in": pool.checkedin() if hasattr(pool, "checkedin") else None,
+        "overflow_in_use": max(pool.overflow(), 0) if hasattr(pool, "overflow") else None,
+        "max_overflow": DB_MAX_OVERFLOW,
+    }
+    stats.update(pool_stats.snapshot())
+    return stats
+
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+replica_engine = create_engine(DATABASE_REPLICA_URL, **get_engine_options(DATABASE_REPLICA_URL)) if DATABASE_REPLICA_URL else None
+
+class RoutingSession(Session):
+    """
+    Sends reads to the replica while the session is marked read-only
+    (see :func:`read_only`) and has not written anything yet. Once a
+    session flushes or runs an INSERT/UPDATE/DELETE it stays on the
+    primary, so it always reads its own writes.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            replica_engine is not None
+            and self.info.get("read_only")
+            and not self.info.get("has_writes")
+            and not self._flushing
+        ):
+            return replica_engine
+        return engine
+
+@event.listens_for(RoutingSession, "after_flush")
+def _mark_flush_write(session, flush_context):
+    session.info["has_writes"] = True
+
+@event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_statement_write(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["has_writes"] = True
+
+def _finance_rollups():
+    # Imported on demand so app.database stays free of the model graph;
+    # FinancialTransaction rows can only be in a session once app.models
+    # has been imported.
+    if "app.models" not in sys.modules:
+        return None
+    from app.services import finance_rollup_service
+    return finance_rollup_service
+
+@event.listens_for(Session, "before_flush")
+def _collect_rollup_deltas(session, flush_context, instances):
+    rollups = _finance_rollups()
+    if rollups is not None:
+        rollups.collect_rollup_deltas(session)
+
+@event.listens_for(Session, "after_flush")
+def _flush_rollup_deltas(session, flush_context):
+    if "rollup_deltas" in session.info:
+        _finance_rollups().flush_rollup_deltas(session)
+
+@event.listens_for(Session, "after_commit")
+def _notify_transactions_committed(session):
+    if "changed_agencies" in session.info:
+        _finance_rollups().notify_transactions_committed(session)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_transaction_changes(session):
+    if "rollup_deltas" in session.info or "changed_agencies" in session.info:
+        _finance_rollups().discard_transaction_changes(session)
 
 SessionLocal = sessionmaker(
     autocommit=False,
     autoflush=False,
-    bind=engine
+    bind=engine,
+    class_=RoutingSession
 )
 
 Base = declarative_base()
 
 def get_db() -> Generator[Session, None, None]:
     db =  SessionLocal()
-    
+
     try:
         yield db
     except Exception:
         db.rollback()
         raise
     finally:
-        db.close()    
-    
+        db.close()
+
+def get_read_db() -> Generator[Session, None, None]:
+    db = SessionLocal(info={"read_only": True})
+
+    try:
+        yield db
+    finally:
+        db.close()
+
 @contextmanager
 def get_db_context():
     db = SessionLocal()
@@ -76,6 +222,47 @@ def get_db_context():
         yield db
     finally:
         db.close()
-@contextmanager
-def get_db_context():
-    db = SessionLocal()
\ No newline at end of file
+
+def read_only(func):
+    @functools.wraps(func)
+    def wrapper(db: Session, *args, **kwargs):
+        previous = db.info.get("read_only", False)
+        db.info["read_only"] = True
+        try:
+            return func(db, *args, **kwargs)
+        finally:
+            db.info["read_only"] = previous
+    return wrapper
+
+async_engine = None
+AsyncSessionLocal = None
+
+if DB_ASYNC_MODE:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+    async_engine = create_async_engine(
+        get_async_database_url(DATABASE_URL),
+        **{key: value for key, value in get_engine_options().items() if key != "poolclass"}
+    )
+
+    AsyncSessionLocal = async_sessionmaker(
+        bind=async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+        class_=AsyncSession
+    )
+
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Async database mode is disabled. Set DB_ASYNC_MODE=true to enable it.")
+
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+async def dispose_async_engine() -> None:
+    if async_engine is not None:
+        await async_engine.dispose()
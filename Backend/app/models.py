@@ -1,4 +1,4 @@
-from sqlalchemy import (Column, Integer, String, Text, Boolean, datetime, Date, Numeric, ForeignKey, JSON, Index, CheckConstraint, ContractStatus)
+from sqlalchemy import (Column, Integer, String, Text, Boolean, datetime, Date, Numeric, ForeignKey, JSON, Index, CheckConstraint, ContractStatus, UniqueConstraint)
 from sqlalchemy.orm import relationship, validates
 from sqlalchemy.sql import func
 from sqlalchemy.dialects.postgresql import UUID
@@ -180,7 +180,7 @@ class FinancialTransaction(Base):
     invoice_id = Column(Integer)
     amount = Column(Numeric(15, 2))
     currency = Column(String(3), default="IDR")
-    exchange_rate = Column(Numeric(10, 6), default=1.000000)
+    exchange_rate = Column(Numeric(18, 6), default=1.000000)
     amount_local = Column(Numeric(15, 2))
     due_date = Column(Date)
     payment_date = Column(Date)
@@ -265,13 +265,59 @@ class Notification(Base):
     
     recipient = relationship("User", back_populates="transaction")
     
+class FinancialRollup(Base):
+    __tablename__ = "financial_rollups"
+    __table_args__ = (
+        UniqueConstraint("agency_id", "currency", "transaction_type", "status", "period", name="uq_financial_rollup_key"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    agency_id = Column(Integer, nullable=False, default=0)
+    currency = Column(String(3), nullable=False)
+    transaction_type = Column(String(30), nullable=False)
+    status = Column(String(20), nullable=False)
+    period = Column(Date, nullable=False)
+    transaction_count = Column(Integer, nullable=False, default=0)
+    amount_total = Column(Numeric(18, 2), nullable=False, default=0)
+    amount_local_total = Column(Numeric(18, 2), nullable=False, default=0)
+    total_amount_total = Column(Numeric(18, 2), nullable=False, default=0)
+    updated_at = Column(datetime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+class ExchangeRate(Base):
+    __tablename__ = "exchange_rates"
+    __table_args__ = (
+        UniqueConstraint("currency", "rate_date", name="uq_exchange_rate_currency_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    currency = Column(String(3), nullable=False)
+    rate_date = Column(Date, nullable=False)
+    rate = Column(Numeric(18, 6), nullable=False)
+    source = Column(String(50))
+    created_at = Column(datetime(timezone=True), server_default=func.now())
+    
+class DocumentCounter(Base):
+    __tablename__ = "document_counters"
+    
+    entity = Column(String(30), primary_key=True)
+    year = Column(Integer, primary_key=True)
+    next_value = Column(Integer, nullable=False, default=1)
+    
 Index('idx_user_role_id', User.role_id)
+Index('idx_user_active_role_id', User.role_id, User.id, postgresql_where=User.is_active == True)
 Index('idx_contract_agency_id', Contract.agency_id)
 Index('idx_contract_status', Contract.status)
 Index('idx_shipment_contract_id', Shipment.contract_id)
 Index('idx_shipment_status', Shipment.status)
 Index('idx_financial_transaction_contract_id', FinancialTransaction.contract_id)
 Index('idx_financial_transaction_status', FinancialTransaction.status)
+Index(
+    'uq_financial_transaction_shipment_invoice',
+    FinancialTransaction.shipment_id,
+    unique=True,
+    postgresql_where=(FinancialTransaction.transaction_type == 'invoice') & (FinancialTransaction.status != 'cancelled'),
+    sqlite_where=(FinancialTransaction.transaction_type == 'invoice') & (FinancialTransaction.status != 'cancelled')
+)
 Index('idx_workflow_history_entity', WorkflowHistory.entity_type, WorkflowHistory.entity_id)
 Index('idx_transaction_user_id', Notification.user_id)
 Index('idx_transaction_is_read', Notification.is_read)
@@ -0,0 +1,137 @@
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy import bindparam, update
+
+from app.database import get_db_context
+
+logger = logging.getLogger(__name__)
+
+ACTIVITY_BUFFER_ENABLED = os.getenv("ACTIVITY_BUFFER_ENABLED", "TRUE").lower() in ("true", "1", "t")
+ACTIVITY_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_FLUSH_INTERVAL", 5))
+ACTIVITY_BUFFER_MAX_PENDING = int(os.getenv("ACTIVITY_BUFFER_MAX_PENDING", 5000))
+
+
+class ActivityBuffer:
+    """
+    Write-behind buffer for ``users.last_login`` and
+    ``user_sessions.last_activity``.
+
+    Timestamps are kept in memory (latest wins per row) and written as one
+    executemany UPDATE per table every ``flush_interval`` seconds, or
+    sooner once ``max_pending`` rows are waiting. Staleness is therefore
+    bounded by the flush interval; pending rows are flushed on shutdown.
+    """
+
+    def __init__(self, enabled: bool, flush_interval: float, max_pending: int):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._logins: Dict[int, datetime] = {}
+        self._activity: Dict[int, datetime] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def record_login(self, user_id: int, timestamp: datetime) -> None:
+        self._record(self._logins, user_id, timestamp)
+
+    def record_activity(self, session_id: int, timestamp: datetime) -> None:
+        self._record(self._activity, session_id, timestamp)
+
+    def _record(self, pending: Dict[int, datetime], key: int, timestamp: datetime) -> None:
+        with self._lock:
+            current = pending.get(key)
+            if current is None or timestamp > current:
+                pending[key] = timestamp
+            backlog = len(self._logins) + len(self._activity)
+        self._ensure_started()
+        if backlog >= self.max_pending:
+            self._wakeup.set()
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="activity-buffer-flusher", daemon=True
+                )
+                self._thread.start()
+                atexit.register(self.stop)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush buffered activity timestamps")
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                logins, self._logins = self._logins, {}
+                activity, self._activity = self._activity, {}
+
+            if not logins and not activity:
+                return 0
+
+            from app.models.user import User
+            from app.models import UserSession
+
+            try:
+                with get_db_context() as db:
+                    if logins:
+                        db.execute(
+                            update(User.__table__)
+                            .where(User.__table__.c.id == bindparam("b_id"))
+                            .values(last_login=bindparam("b_ts")),
+                            [{"b_id": key, "b_ts": ts} for key, ts in logins.items()]
+                        )
+                    if activity:
+                        db.execute(
+                            update(UserSession.__table__)
+                            .where(UserSession.__table__.c.id == bindparam("b_id"))
+                            .values(last_activity=bindparam("b_ts")),
+                            [{"b_id": key, "b_ts": ts} for key, ts in activity.items()]
+                        )
+                    db.commit()
+            except Exception:
+                self._requeue(logins, activity)
+                raise
+
+            return len(logins) + len(activity)
+
+    def _requeue(self, logins: Dict[int, datetime], activity: Dict[int, datetime]) -> None:
+        with self._lock:
+            for key, ts in logins.items():
+                if key not in self._logins or self._logins[key] < ts:
+                    self._logins[key] = ts
+            for key, ts in activity.items():
+                if key not in self._activity or self._activity[key] < ts:
+                    self._activity[key] = ts
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.flush_interval)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush buffered activity timestamps on shutdown")
+
+
+activity_buffer = ActivityBuffer(
+    enabled=ACTIVITY_BUFFER_ENABLED,
+    flush_interval=ACTIVITY_FLUSH_INTERVAL,
+    max_pending=ACTIVITY_BUFFER_MAX_PENDING
+)
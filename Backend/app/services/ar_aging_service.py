@@ -0,0 +1,202 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, UTC
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy import and_, case, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.models import FinancialTransaction
+from app.services.finance_rollup_service import on_transactions_committed
+
+AR_AGING_CACHE_DATES = int(os.getenv("AR_AGING_CACHE_DATES", 32))
+AR_AGING_CACHE_TTL = float(os.getenv("AR_AGING_CACHE_TTL", 300))
+AR_OPEN_STATUSES = ("pending", "issued", "partially_paid", "overdue")
+AGING_BUCKETS = ("current", "days_1_30", "days_31_60", "days_61_90", "days_over_90")
+
+ZERO = Decimal("0")
+
+
+def aging_statement(as_of: date, agency_ids: Optional[Iterable[int]] = None):
+    """
+    One grouped query for every agency's buckets as of ``as_of``.
+
+    An invoice counts as open if it is still in an open status, or was
+    paid after ``as_of``. Bucket boundaries are precomputed dates, so the
+    query only compares ``due_date`` against constants.
+    """
+    ledger = FinancialTransaction.__table__
+    due = ledger.c.due_date
+    amount = func.coalesce(ledger.c.amount_local, 0)
+    agency = func.coalesce(ledger.c.agency_id, 0)
+    day_30, day_60, day_90 = (as_of - timedelta(days=days) for days in (30, 60, 90))
+
+    buckets = {
+        "current": or_(due.is_(None), due >= as_of),
+        "days_1_30": and_(due < as_of, due >= day_30),
+        "days_31_60": and_(due < day_30, due >= day_60),
+        "days_61_90": and_(due < day_60, due >= day_90),
+        "days_over_90": due < day_90,
+    }
+
+    statement = (
+        select(
+            agency.label("agency_id"),
+            func.count().label("open_invoices"),
+            *(func.coalesce(func.sum(case((condition, amount), else_=0)), 0).label(name)
+              for name, condition in buckets.items())
+        )
+        .where(
+            ledger.c.transaction_type == "invoice",
+            ledger.c.created_at < as_of + timedelta(days=1),
+            or_(
+                ledger.c.status.in_(AR_OPEN_STATUSES),
+                and_(ledger.c.status == "paid", ledger.c.payment_date > as_of)
+            )
+        )
+        .group_by(agency)
+    )
+    if agency_ids is not None:
+        statement = statement.where(agency.in_(list(agency_ids)))
+    return statement
+
+
+def compute_ar_aging(db: Session, as_of: date, agency_ids: Optional[Iterable[int]] = None) -> Dict[int, dict]:
+    report = {}
+    for row in db.execute(aging_statement(as_of, agency_ids)).mappings():
+        buckets = {name: Decimal(row[name] or ZERO) for name in AGING_BUCKETS}
+        report[row["agency_id"]] = dict(
+            buckets,
+            open_invoices=row["open_invoices"],
+            total=sum(buckets.values(), ZERO)
+        )
+    return report
+
+
+class ARAgingCache:
+    """
+    Aging reports per as-of date (LRU over ``max_dates`` dates).
+
+    A committed change to an agency's transactions only marks that agency
+    stale in every cached report; the next read re-queries just the stale
+    agencies and merges them in. Only commits made through this process's
+    sessions invalidate, so a report is also recomputed in full once it is
+    older than ``ttl`` seconds; that bounds how long changes from other
+    workers or scripts stay invisible.
+
+    A read takes the stale set for its date under the lock and leaves an
+    empty one behind, so an invalidation that arrives while it queries
+    stays pending for the next read. Each taken agency is tagged with the
+    read's refresh number, and only the latest refresh of an agency may
+    write its row back.
+    """
+
+    def __init__(self, max_dates: int, ttl: float):
+        self.max_dates = max_dates
+        self.ttl = ttl
+        self._reports: "OrderedDict[date, Dict[int, dict]]" = OrderedDict()
+        self._stale: Dict[date, Set[int]] = {}
+        self._computed_at: Dict[date, float] = {}
+        self._refreshing: Dict[date, Dict[int, int]] = {}
+        self._refreshes = 0
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, as_of: date) -> Dict[int, dict]:
+        stale: Set[int] = set()
+        with self._lock:
+            report = self._reports.get(as_of)
+            if report is not None and time.monotonic() - self._computed_at[as_of] >= self.ttl:
+                report = None
+            if report is not None:
+                self._reports.move_to_end(as_of)
+                stale = self._stale[as_of]
+                if stale:
+                    self._stale[as_of] = set()
+                    self._refreshes += 1
+                    refresh = self._refreshes
+                    owners = self._refreshing.setdefault(as_of, {})
+                    owners.update(dict.fromkeys(stale, refresh))
+            else:
+                self._stale.setdefault(as_of, set())
+                self._refreshing.pop(as_of, None)
+
+        if report is None:
+            computed_at = time.monotonic()
+            report = compute_ar_aging(db, as_of)
+            with self._lock:
+                if as_of not in self._stale:
+                    return dict(report)
+                self._reports[as_of] = report
+                self._reports.move_to_end(as_of)
+                self._computed_at[as_of] = computed_at
+                while len(self._reports) > self.max_dates:
+                    evicted, _ = self._reports.popitem(last=False)
+                    self._stale.pop(evicted, None)
+                    self._computed_at.pop(evicted, None)
+                    self._refreshing.pop(evicted, None)
+            return dict(report)
+
+        if not stale:
+            return dict(report)
+
+        try:
+            fresh = compute_ar_aging(db, as_of, stale)
+        except Exception:
+            with self._lock:
+                self._release(as_of, stale, refresh, requeue=True)
+            raise
+
+        with self._lock:
+            current = self._reports.get(as_of)
+            owned = self._release(as_of, stale, refresh)
+            if current is not None:
+                merged = {agency_id: row for agency_id, row in current.items() if agency_id not in owned}
+                merged.update((agency_id, row) for agency_id, row in fresh.items() if agency_id in owned)
+                self._reports[as_of] = merged
+        result = {agency_id: row for agency_id, row in report.items() if agency_id not in stale}
+        result.update(fresh)
+        return result
+
+    def _release(self, as_of: date, agency_ids: Set[int], refresh: int, requeue: bool = False) -> Set[int]:
+        """Drop this refresh's claim on ``agency_ids``; return the ones it still owned."""
+        owners = self._refreshing.get(as_of, {})
+        owned = {agency_id for agency_id in agency_ids if owners.get(agency_id) == refresh}
+        for agency_id in owned:
+            del owners[agency_id]
+        if requeue and as_of in self._stale:
+            self._stale[as_of].update(owned)
+        return owned
+
+    def invalidate_agencies(self, agency_ids: Set[int]) -> None:
+        with self._lock:
+            for stale in self._stale.values():
+                stale.update(agency_ids)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._reports.clear()
+            self._stale.clear()
+            self._computed_at.clear()
+            self._refreshing.clear()
+
+
+ar_aging_cache = ARAgingCache(AR_AGING_CACHE_DATES, AR_AGING_CACHE_TTL)
+on_transactions_committed(ar_aging_cache.invalidate_agencies)
+
+
+def get_ar_aging(db: Session, as_of: Optional[date] = None, agency_id: Optional[int] = None) -> dict:
+    as_of = as_of or datetime.now(UTC).date()
+    report = ar_aging_cache.get(db, as_of)
+    if agency_id is not None:
+        report = {agency_id: report[agency_id]} if agency_id in report else {}
+
+    totals = {name: sum((row[name] for row in report.values()), ZERO) for name in AGING_BUCKETS + ("total",)}
+    totals["open_invoices"] = sum(row["open_invoices"] for row in report.values())
+    return {
+        "as_of": as_of.isoformat(),
+        "agencies": [dict(row, agency_id=key) for key, row in sorted(report.items())],
+        "totals": totals
+    }
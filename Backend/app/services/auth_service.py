@@ -1,28 +1,41 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime, timedelta
 from typing import Optional
 from app.models.auth import UserLogin, User
-from app.config.security import verify_password, create_access_token
-from app.services.user_service import get_user_by_username
+from app.config.security import create_access_token
+from app.services.user_service import (
+    find_session_id, get_user_by_username, get_user_by_username_async, stamp_last_login,
+    touch_session_activity, touch_session_activity_async
+)
+from app.services.token_cache import token_cache, snapshot_user
+from app.services.hashing_service import verify_password_async
+from app.services.permission_service import permission_registry
+from app.services.role_registry import role_registry
 from backend.app.model import Role
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
-    user = get_user_by_username(db, username)
+async def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+    user = await run_in_threadpool(get_user_by_username, db, username)
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         return None
     return user
 
-def login_user(db: Session, user_data: UserLogin):
+def finish_login(db: Session, user: User):
+    stamp_last_login(db, user)
+    return role_registry.get(db, user.role_id)
+
+async def login_user(db: Session, user_data: UserLogin):
     """
     Authenticate and logs in a userm generating a JWT token.
     
     Raises:
     HTTPException: If authentication fails or the user is inactive.
     """
-    user = authenticate_user(db, user_data.username, user_data.password)
+    user = await authenticate_user(db, user_data.username, user_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNATHORIZED,
@@ -37,17 +50,15 @@ def login_user(db: Session, user_data: UserLogin):
             headers={"WWW-Authenticate": "Bearer"}
         )
         
-    user.last_login = datetime.utcnow()
-    db.commit()
-    db.refresh(user)
+    role = await run_in_threadpool(finish_login, db, user)
     
     access_token_expires = timedelta(minutes=1440)
     access_token = create_access_token(
         data={
             "sub": user.username,
             "user_id": str(user.id),
-            "role_id": user.role.id if user.role else None,
-            "role_name": user.role.name if user.role else "user"
+            "role_id": role.id if role else None,
+            "role_name": role.name if role else "user"
         },
         expires_delta=access_token_expires
     )
@@ -61,7 +72,7 @@ def login_user(db: Session, user_data: UserLogin):
             "email": user.email,
             "first_name": user.first.name,
             "last_name": user.last.name,
-            "role_name": user.role.name if user.role else "user",
+            "role_name": role.name if role else "user",
             "is_active": user.is_active,
             "is_inactive": user.is_offline
         }
@@ -70,6 +81,12 @@ def login_user(db: Session, user_data: UserLogin):
 def get_current_user(db: Session, token: str):
     from app.config.security import verify_token
     
+    role_registry.ensure_current(db)
+    cached = token_cache.get(token)
+    if cached is not None:
+        touch_session_activity(db, cached.session_id)
+        return cached
+    
     payload = verify_token(token)
     if payload is None:
         raise HTTPException(
@@ -93,8 +110,49 @@ def get_current_user(db: Session, token: str):
             detail="User not found",
             headers={"WWW_Authenticate": "Bearer"},
         )
+    
+    snapshot = snapshot_user(user, find_session_id(db, token))
+    token_cache.put(token, snapshot, token_exp=payload.get("exp"))
+    touch_session_activity(db, snapshot.session_id)
+    return snapshot
+
+async def get_current_user_async(db: AsyncSession, token: str):
+    from app.config.security import verify_token
+    
+    await role_registry.ensure_current_async(db)
+    cached = token_cache.get(token)
+    if cached is not None:
+        await touch_session_activity_async(db, cached.session_id)
+        return cached
+    
+    payload = verify_token(token)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate the credentials",
+            headers={"WWW_Authenticate": "Bearer"}
+        )
+    
+    username: str = payload.get("sub")
+    if username is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate the credentials",
+            headers={"WWW_Authenticate": "Bearer"},
+        )
         
-    return user
+    user = await get_user_by_username_async(db, username)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="User not found",
+            headers={"WWW_Authenticate": "Bearer"},
+        )
+    
+    snapshot = snapshot_user(user, await db.run_sync(find_session_id, token))
+    token_cache.put(token, snapshot, token_exp=payload.get("exp"))
+    await touch_session_activity_async(db, snapshot.session_id)
+    return snapshot
 
 def check_user_permission(user, required_role:str = None, required_permissions: list = None):
     if not user.is_active:
@@ -103,23 +161,18 @@ def check_user_permission(user, required_role:str = None, required_permissions:
             detail="User account is deactivated"
         )
         
-    if user.Role and Role.name == "admin":
+    role = role_registry.peek(user.role_id)
+    if role and role.name == "admin":
         return True
     
-    if required_permissions and user.role:
-        role_permissions = user.role.permissions if user.role.permisssions else set()
+    if required_permissions:
+        required_mask = permission_registry.mask_for(required_permissions)
+        granted_mask = permission_registry.role_mask(role)
         
-        if not set(required_permissions).issubset(role_permissions):
-            missing_permissions = set(required_permissions) - role_permissions
+        if granted_mask & required_mask != required_mask:
+            missing_permissions = permission_registry.names_for(required_mask & ~granted_mask)
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Access is denied. Missing permissions: {','. join(missing_permissions)}"
             )
     return True
-
-def check_user_permission(user, required_role:str = None, required_permissions: list = None):
-    if user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access is denied, user account already active. Please try again."
-        )
\ No newline at end of file
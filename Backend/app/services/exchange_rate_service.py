@@ -0,0 +1,145 @@
+import os
+import threading
+import time
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import ExchangeRate
+
+BASE_CURRENCY = os.getenv("BASE_CURRENCY", "IDR")
+RATE_SCALE = 10 ** 6
+EXCHANGE_RATE_CACHE_TTL = float(os.getenv("EXCHANGE_RATE_CACHE_TTL", 300))
+
+
+def rate_to_int(rate) -> int:
+    """Exchange rates are stored as ``Numeric(18, 6)``; keep them as micro-units."""
+    return int(Decimal(rate).scaleb(6).to_integral_value())
+
+
+class ExchangeRateCache:
+    """
+    In-memory copy of ``exchange_rates``, loaded one currency at a time.
+
+    Rates are kept per currency as parallel sorted lists of dates and
+    fixed-point (1e-6) integers, so a lookup is a bisect for the latest
+    rate on or before the requested date. ``set_exchange_rates`` drops the
+    currencies it writes; a currency is also reloaded once it is older
+    than ``ttl`` seconds, so rates written by other workers or scripts are
+    picked up.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, List[date], List[int]]] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, currency: str) -> Tuple[List[date], List[int]]:
+        generation = self._generation
+        rows = db.execute(
+            select(ExchangeRate.rate_date, ExchangeRate.rate)
+            .where(ExchangeRate.currency == currency)
+            .order_by(ExchangeRate.rate_date)
+        ).all()
+        dates = [row.rate_date for row in rows]
+        rates = [rate_to_int(row.rate) for row in rows]
+        with self._lock:
+            if generation == self._generation:
+                self._entries[currency] = (time.monotonic(), dates, rates)
+        return dates, rates
+
+    def rate_int(self, db: Session, currency: str, on_date: date) -> Optional[int]:
+        if currency == BASE_CURRENCY:
+            return RATE_SCALE
+        with self._lock:
+            entry = self._entries.get(currency)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            dates, rates = self._load(db, currency)
+        else:
+            _, dates, rates = entry
+
+        index = bisect_right(dates, on_date) - 1
+        if index < 0:
+            return None
+        return rates[index]
+
+    def invalidate(self, currency: Optional[str] = None) -> None:
+        with self._lock:
+            self._generation += 1
+            if currency is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(currency, None)
+
+
+exchange_rate_cache = ExchangeRateCache(EXCHANGE_RATE_CACHE_TTL)
+
+
+def get_exchange_rate(db: Session, currency: str, on_date: date) -> Decimal:
+    rate = exchange_rate_cache.rate_int(db, currency, on_date)
+    if rate is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No exchange rate for {currency} on or before {on_date.isoformat()}"
+        )
+    return Decimal(rate).scaleb(-6)
+
+
+def set_exchange_rates(db: Session, rates: List[Tuple[str, date, Decimal]], source: Optional[str] = None) -> int:
+    """
+    Upsert ``(currency, rate_date, rate)`` rows and drop the cached
+    currencies they touch.
+    """
+    if not rates:
+        return 0
+
+    for currency, _, rate in rates:
+        if currency == BASE_CURRENCY:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"{BASE_CURRENCY} is the base currency")
+        if Decimal(rate) <= 0:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Exchange rate must be positive")
+
+    table = ExchangeRate.__table__
+    rows = [
+        {"currency": currency, "rate_date": rate_date, "rate": Decimal(rate), "source": source}
+        for currency, rate_date, rate in rates
+    ]
+
+    try:
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            stmt = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["currency", "rate_date"],
+                set_={"rate": stmt.excluded.rate, "source": stmt.excluded.source}
+            )
+            db.execute(stmt, rows)
+        else:
+            for row in rows:
+                existing = db.execute(
+                    select(ExchangeRate).where(
+                        ExchangeRate.currency == row["currency"],
+                        ExchangeRate.rate_date == row["rate_date"]
+                    )
+                ).scalars().first()
+                if existing is None:
+                    db.add(ExchangeRate(**row))
+                else:
+                    existing.rate = row["rate"]
+                    existing.source = row["source"]
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        for currency in {row["currency"] for row in rows}:
+            exchange_rate_cache.invalidate(currency)
+
+    return len(rows)
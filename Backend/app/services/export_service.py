@@ -0,0 +1,218 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Iterable, Iterator, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.user import User, Role
+from app.models import FinancialTransaction
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+LEDGER_EXPORT_CHUNK_SIZE = int(os.getenv("LEDGER_EXPORT_CHUNK_SIZE", 10000))
+
+LEDGER_COLUMNS = [
+    ("id", "int64"),
+    ("transaction_number", "string"),
+    ("transaction_type", "string"),
+    ("status", "string"),
+    ("agency_id", "int64"),
+    ("contract_id", "int64"),
+    ("shipment_id", "int64"),
+    ("invoice_id", "int64"),
+    ("currency", "string"),
+    ("amount", "decimal(15,2)"),
+    ("exchange_rate", "decimal(18,6)"),
+    ("amount_local", "decimal(15,2)"),
+    ("tax_rate", "decimal(5,2)"),
+    ("tax_amount", "decimal(15,2)"),
+    ("discount_amount", "decimal(15,2)"),
+    ("total_amount", "decimal(15,2)"),
+    ("due_date", "date"),
+    ("payment_date", "date"),
+    ("preference_method", "string"),
+    ("description", "string"),
+    ("created_at", "timestamp"),
+    ("updated_at", "timestamp"),
+]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def user_export_statement():
+    return (
+        select(
+            User.id,
+            User.username,
+            User.email,
+            User.first_name,
+            User.last_name,
+            User.is_active,
+            User.last_login,
+            User.created_at,
+            Role.id.label("role_id"),
+            Role.name.label("role_name"),
+            Role.description.label("role_description")
+        )
+        .select_from(User)
+        .outerjoin(Role, User.role_id == Role.id)
+        .order_by(User.id)
+    )
+
+
+def role_export_statement():
+    return select(
+        Role.id,
+        Role.name,
+        Role.description,
+        Role.permissions,
+        Role.created_at,
+        Role.updated_at
+    ).order_by(Role.id)
+
+
+def ledger_export_statement(
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    agency_id: Optional[int] = None,
+    statuses: Optional[Iterable[str]] = None
+):
+    ledger = FinancialTransaction.__table__
+    statement = select(*(ledger.c[name] for name, _ in LEDGER_COLUMNS)).order_by(ledger.c.id)
+
+    if date_from is not None:
+        statement = statement.where(ledger.c.created_at >= date_from)
+    if date_to is not None:
+        statement = statement.where(ledger.c.created_at < date_to)
+    if agency_id is not None:
+        statement = statement.where(ledger.c.agency_id == agency_id)
+    if statuses is not None:
+        statement = statement.where(ledger.c.status.in_(list(statuses)))
+    return statement
+
+
+def iter_ndjson(db: Session, statement) -> Iterator[str]:
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=EXPORT_CHUNK_SIZE))
+    for partition in result.partitions():
+        yield "".join(
+            json.dumps(dict(row._mapping), default=_json_default) + "\n"
+            for row in partition
+        )
+
+
+def iter_csv(db: Session, statement, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[str]:
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=chunk_size))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(result.keys())
+    for partition in result.partitions():
+        for row in partition:
+            writer.writerow(
+                json.dumps(value, default=_json_default) if isinstance(value, (dict, list)) else value
+                for value in row
+            )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+    remainder = buffer.getvalue()
+    if remainder:
+        yield remainder
+
+
+def stream_export(db: Session, statement, fmt: str, filename: str) -> StreamingResponse:
+    if fmt not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid export format. Use 'ndjson' or 'csv'."
+        )
+
+    rows = iter_ndjson(db, statement) if fmt == "ndjson" else iter_csv(db, statement)
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'}
+    )
+
+
+def export_users(db: Session, fmt: str = "ndjson") -> StreamingResponse:
+    return stream_export(db, user_export_statement(), fmt, "users")
+
+
+def export_roles(db: Session, fmt: str = "ndjson") -> StreamingResponse:
+    return stream_export(db, role_export_statement(), fmt, "roles")
+
+
+def write_ledger_csv(db: Session, statement, path: str, chunk_size: int = LEDGER_EXPORT_CHUNK_SIZE) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        for chunk in iter_csv(db, statement, chunk_size):
+            handle.write(chunk)
+
+
+def ledger_arrow_schema():
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise RuntimeError("Parquet export requires the optional 'pyarrow' package: pip install pyarrow")
+
+    types = {
+        "int64": pa.int64(),
+        "string": pa.string(),
+        "date": pa.date32(),
+        "timestamp": pa.timestamp("us", tz="UTC"),
+    }
+    fields = []
+    for name, kind in LEDGER_COLUMNS:
+        if kind.startswith("decimal("):
+            precision, scale = (int(part) for part in kind[len("decimal("):-1].split(","))
+            fields.append(pa.field(name, pa.decimal128(precision, scale)))
+        else:
+            fields.append(pa.field(name, types[kind]))
+    return pa.schema(fields)
+
+
+def write_ledger_parquet(
+    db: Session,
+    statement,
+    path: str,
+    chunk_size: int = LEDGER_EXPORT_CHUNK_SIZE,
+    compression: str = "zstd"
+) -> int:
+    """
+    Stream ``statement`` from a server-side cursor into a Parquet file,
+    one row group per ``chunk_size`` rows, so peak memory is one chunk.
+    """
+    schema = ledger_arrow_schema()
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows_written = 0
+    result = db.execute(statement.execution_options(stream_results=True, yield_per=chunk_size))
+    with pq.ParquetWriter(path, schema, compression=compression) as writer:
+        for partition in result.partitions():
+            columns = list(zip(*partition))
+            batch = pa.record_batch(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema
+            )
+            writer.write_batch(batch)
+            rows_written += len(partition)
+    return rows_written
@@ -0,0 +1,325 @@
+from collections import namedtuple
+from datetime import date, datetime, UTC
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import Date, cast, delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, attributes
+
+from app.models import FinancialRollup, FinancialTransaction
+from app.schemasPy import FinancialStatstics
+
+REVENUE_TYPES = ("invoice",)
+REVENUE_STATUSES = ("paid",)
+OUTSTANDING_STATUSES = ("pending", "issued", "partially_paid", "overdue")
+OVERDUE_STATUS = "overdue"
+
+ROLLUP_FIELDS = ("agency_id", "currency", "transaction_type", "status", "created_at")
+AMOUNT_FIELDS = ("amount", "amount_local", "total_amount")
+TRACKED_FIELDS = ROLLUP_FIELDS + AMOUNT_FIELDS
+DATE_FIELDS = ("due_date", "payment_date")
+
+RollupKey = namedtuple("RollupKey", ["agency_id", "currency", "transaction_type", "status", "period"])
+RollupDelta = namedtuple("RollupDelta", ["key", "count", "amount", "amount_local", "total_amount"])
+
+ZERO = Decimal("0")
+
+_commit_listeners: List[Callable[[Set[int]], None]] = []
+
+
+def month_start(value: Optional[datetime]) -> date:
+    """Rollup period of a ``created_at`` value: its month in UTC (naive values are UTC)."""
+    value = value or datetime.now(UTC)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(UTC)
+    return date(value.year, value.month, 1)
+
+
+def rollup_key(values: dict) -> RollupKey:
+    return RollupKey(
+        agency_id=values.get("agency_id") or 0,
+        currency=values.get("currency") or "IDR",
+        transaction_type=values["transaction_type"],
+        status=values.get("status") or "pending",
+        period=month_start(values.get("created_at"))
+    )
+
+
+def rollup_delta(values: dict, sign: int) -> RollupDelta:
+    return RollupDelta(
+        key=rollup_key(values),
+        count=sign,
+        amount=sign * Decimal(values.get("amount") or ZERO),
+        amount_local=sign * Decimal(values.get("amount_local") or ZERO),
+        total_amount=sign * Decimal(values.get("total_amount") or ZERO)
+    )
+
+
+def transition_deltas(before: Optional[dict], after: Optional[dict]) -> List[RollupDelta]:
+    """
+    Deltas that move one transaction from its ``before`` state to its
+    ``after`` state (either may be ``None`` for inserts and deletes).
+    """
+    deltas = []
+    if before is not None:
+        deltas.append(rollup_delta(before, -1))
+    if after is not None:
+        deltas.append(rollup_delta(after, 1))
+    return deltas
+
+
+def _merge(deltas: Iterable[RollupDelta]) -> Dict[RollupKey, RollupDelta]:
+    merged: Dict[RollupKey, RollupDelta] = {}
+    for delta in deltas:
+        current = merged.get(delta.key)
+        if current is None:
+            merged[delta.key] = delta
+        else:
+            merged[delta.key] = RollupDelta(
+                delta.key,
+                current.count + delta.count,
+                current.amount + delta.amount,
+                current.amount_local + delta.amount_local,
+                current.total_amount + delta.total_amount
+            )
+    return {
+        key: delta for key, delta in merged.items()
+        if delta.count or delta.amount or delta.amount_local or delta.total_amount
+    }
+
+
+def on_transactions_committed(listener: Callable[[Set[int]], None]):
+    """
+    Register ``listener`` to be called with the agency ids whose
+    transactions changed, once the changing session commits.
+    """
+    _commit_listeners.append(listener)
+    return listener
+
+
+def mark_agencies_changed(session: Session, agency_ids: Iterable[Optional[int]]) -> None:
+    session.info.setdefault("changed_agencies", set()).update(agency_id or 0 for agency_id in agency_ids)
+
+
+def apply_rollup_deltas(db: Session, deltas: Iterable[RollupDelta]) -> int:
+    """
+    Fold ``deltas`` into ``financial_rollups`` inside the caller's
+    transaction. Bulk jobs that change transactions with Core statements
+    (which bypass the ORM flush hook) call this directly.
+    """
+    deltas = list(deltas)
+    mark_agencies_changed(db, (delta.key.agency_id for delta in deltas))
+
+    merged = _merge(deltas)
+    if not merged:
+        return 0
+    connection = db.connection()
+
+    # Key order keeps concurrent writers (API flushes, overdue sweep,
+    # revaluation) locking shared rollup rows in the same sequence.
+    table = FinancialRollup.__table__
+    rows = [
+        {
+            **delta.key._asdict(),
+            "transaction_count": delta.count,
+            "amount_total": delta.amount,
+            "amount_local_total": delta.amount_local,
+            "total_amount_total": delta.total_amount,
+        }
+        for _, delta in sorted(merged.items())
+    ]
+    key_columns = list(RollupKey._fields)
+
+    dialect = connection.dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        upsert = (postgresql if dialect == "postgresql" else sqlite).insert(table)
+        upsert = upsert.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={
+                "transaction_count": table.c.transaction_count + upsert.excluded.transaction_count,
+                "amount_total": table.c.amount_total + upsert.excluded.amount_total,
+                "amount_local_total": table.c.amount_local_total + upsert.excluded.amount_local_total,
+                "total_amount_total": table.c.total_amount_total + upsert.excluded.total_amount_total,
+                "updated_at": func.now(),
+            }
+        )
+        connection.execute(upsert, rows)
+        return len(rows)
+
+    for row in rows:
+        result = connection.execute(
+            update(table)
+            .where(*(table.c[column] == row[column] for column in key_columns))
+            .values(
+                transaction_count=table.c.transaction_count + row["transaction_count"],
+                amount_total=table.c.amount_total + row["amount_total"],
+                amount_local_total=table.c.amount_local_total + row["amount_local_total"],
+                total_amount_total=table.c.total_amount_total + row["total_amount_total"],
+            )
+        )
+        if result.rowcount == 0:
+            connection.execute(insert(table), row)
+    return len(rows)
+
+
+def tracked_columns():
+    return [getattr(FinancialTransaction, field) for field in TRACKED_FIELDS]
+
+
+def transaction_values(obj) -> dict:
+    return {field: getattr(obj, field) for field in TRACKED_FIELDS}
+
+
+def _state_values(obj, committed: bool) -> dict:
+    if not committed:
+        return transaction_values(obj)
+
+    values = {}
+    state = attributes.instance_state(obj)
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        if history.deleted:
+            values[field] = history.deleted[0]
+            continue
+        values[field] = getattr(obj, field)
+    return values
+
+
+def collect_rollup_deltas(session: Session) -> None:
+    deltas = []
+    for obj in session.new:
+        if isinstance(obj, FinancialTransaction):
+            # created_at is server-defaulted; pin it now so the period used
+            # here is the one later deltas and rebuilds will read back.
+            if obj.created_at is None:
+                obj.created_at = datetime.now(UTC)
+            deltas.extend(transition_deltas(None, _state_values(obj, committed=False)))
+    for obj in session.dirty:
+        if isinstance(obj, FinancialTransaction) and session.is_modified(obj):
+            before = _state_values(obj, committed=True)
+            after = _state_values(obj, committed=False)
+            if before != after:
+                deltas.extend(transition_deltas(before, after))
+            elif any(attributes.instance_state(obj).attrs[field].history.has_changes() for field in DATE_FIELDS):
+                mark_agencies_changed(session, [after["agency_id"]])
+    for obj in session.deleted:
+        if isinstance(obj, FinancialTransaction):
+            deltas.extend(transition_deltas(_state_values(obj, committed=True), None))
+
+    if deltas:
+        session.info.setdefault("rollup_deltas", []).extend(deltas)
+
+
+def flush_rollup_deltas(session: Session) -> None:
+    deltas = session.info.pop("rollup_deltas", None)
+    if deltas:
+        apply_rollup_deltas(session, deltas)
+
+
+def notify_transactions_committed(session: Session) -> None:
+    agency_ids = session.info.pop("changed_agencies", None)
+    if agency_ids:
+        for listener in _commit_listeners:
+            listener(agency_ids)
+
+
+def discard_transaction_changes(session: Session) -> None:
+    session.info.pop("rollup_deltas", None)
+    session.info.pop("changed_agencies", None)
+
+
+def month_expression(dialect: str, column):
+    """SQL counterpart of ``month_start``: the UTC month, whatever the session time zone."""
+    if dialect == "sqlite":
+        return func.date(column, "start of month")
+    return cast(func.date_trunc("month", func.timezone("UTC", column)), Date)
+
+
+def rebuild_financial_rollups(db: Session) -> int:
+    rollups = FinancialRollup.__table__
+    ledger = FinancialTransaction.__table__
+    period = month_expression(db.get_bind().dialect.name, func.coalesce(ledger.c.created_at, func.now()))
+
+    aggregate = select(
+        func.coalesce(ledger.c.agency_id, 0),
+        func.coalesce(ledger.c.currency, "IDR"),
+        ledger.c.transaction_type,
+        func.coalesce(ledger.c.status, "pending"),
+        period,
+        func.count(),
+        func.coalesce(func.sum(ledger.c.amount), 0),
+        func.coalesce(func.sum(ledger.c.amount_local), 0),
+        func.coalesce(func.sum(ledger.c.total_amount), 0),
+    ).group_by(
+        func.coalesce(ledger.c.agency_id, 0),
+        func.coalesce(ledger.c.currency, "IDR"),
+        ledger.c.transaction_type,
+        func.coalesce(ledger.c.status, "pending"),
+        period,
+    )
+
+    try:
+        db.execute(delete(rollups))
+        result = db.execute(
+            insert(rollups).from_select(
+                [
+                    "agency_id", "currency", "transaction_type", "status", "period",
+                    "transaction_count", "amount_total", "amount_local_total", "total_amount_total",
+                ],
+                aggregate
+            )
+        )
+        db.commit()
+        return result.rowcount
+    except Exception:
+        db.rollback()
+        raise
+
+
+def get_financial_statistics(
+    db: Session,
+    agency_id: Optional[int] = None,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None
+) -> FinancialStatstics:
+    query = select(
+        FinancialRollup.transaction_type,
+        FinancialRollup.status,
+        func.sum(FinancialRollup.transaction_count),
+        func.sum(FinancialRollup.amount_local_total),
+    ).group_by(FinancialRollup.transaction_type, FinancialRollup.status)
+
+    if agency_id is not None:
+        query = query.where(FinancialRollup.agency_id == agency_id)
+    if period_from is not None:
+        query = query.where(FinancialRollup.period >= month_start(period_from))
+    if period_to is not None:
+        query = query.where(FinancialRollup.period <= month_start(period_to))
+
+    total_transactions = 0
+    total_revenue = ZERO
+    outstanding = ZERO
+    overdue = 0
+    by_type: Dict[str, int] = {}
+
+    for transaction_type, status, count, amount_local in db.execute(query):
+        count = count or 0
+        amount_local = Decimal(amount_local or ZERO)
+        total_transactions += count
+        by_type[transaction_type] = by_type.get(transaction_type, 0) + count
+        if transaction_type in REVENUE_TYPES:
+            if status in REVENUE_STATUSES:
+                total_revenue += amount_local
+            if status in OUTSTANDING_STATUSES:
+                outstanding += amount_local
+            if status == OVERDUE_STATUS:
+                overdue += count
+
+    return FinancialStatstics(
+        total_transaction=total_transactions,
+        total_revenue=float(total_revenue),
+        outstanding_payments=float(outstanding),
+        overdue_payments=overdue,
+        transactions_by_type=by_type
+    )
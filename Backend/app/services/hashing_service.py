@@ -0,0 +1,102 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from fastapi import HTTPException, status
+
+from app.config.security import SecurityConfig, get_password_hash, verify_password
+
+
+class HashingService:
+    """
+    Runs bcrypt hashing and verification in a bounded process pool.
+
+    At most ``max_concurrency`` jobs run at once; up to ``max_queue`` more
+    may wait for a slot. Anything beyond that is rejected with a 503 so a
+    login burst degrades into fast failures instead of a stalled API.
+    """
+
+    def __init__(self, workers: int, max_concurrency: int, max_queue: int, start_method: str):
+        self.workers = workers
+        self.start_method = start_method
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Workers start lazily, after the API already runs threads
+                # (activity flusher, pool); forking then could copy a held lock.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context(self.start_method)
+                )
+            return self._executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def _submit(self, func, *args):
+        with self._lock:
+            if self._pending >= self.max_concurrency + self.max_queue:
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service is busy. Please try again.",
+                    headers={"Retry-After": "1"}
+                )
+            self._pending += 1
+
+        try:
+            async with self._get_semaphore():
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash_password(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(verify_password, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        hashes = []
+        for start in range(0, len(passwords), self.max_concurrency):
+            window = passwords[start:start + self.max_concurrency]
+            hashes.extend(await asyncio.gather(*(self.hash_password(password) for password in window)))
+        return hashes
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+hashing_service = HashingService(
+    workers=SecurityConfig.HASH_WORKERS,
+    max_concurrency=SecurityConfig.HASH_MAX_CONCURRENCY,
+    max_queue=SecurityConfig.HASH_MAX_QUEUE,
+    start_method=SecurityConfig.HASH_START_METHOD
+)
+
+
+async def hash_password_async(password: str) -> str:
+    return await hashing_service.hash_password(password)
+
+
+async def hash_passwords_async(passwords: List[str]) -> List[str]:
+    return await hashing_service.hash_many(passwords)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_service.verify_password(plain_password, hashed_password)
@@ -0,0 +1,231 @@
+import os
+from datetime import date, datetime, timedelta, UTC
+from decimal import Decimal
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, func, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import Agency, Contract, FinancialTransaction, Shipment, WorkflowHistory
+from app.services.exchange_rate_service import RATE_SCALE, exchange_rate_cache
+from app.services.finance_rollup_service import TRACKED_FIELDS, apply_rollup_deltas, transition_deltas
+from app.services.numbering_service import allocate_document_numbers
+from app.services.revaluation_service import PERCENT_SCALE, div_round, from_cents, to_cents
+
+INVOICE_DEFAULT_PAYMENT_TERMS = int(os.getenv("INVOICE_DEFAULT_PAYMENT_TERMS", 30))
+INVOICE_TYPE = "invoice"
+INVOICE_STATUS = "issued"
+
+
+def active_invoice_exists():
+    return (
+        select(FinancialTransaction.id)
+        .where(
+            FinancialTransaction.shipment_id == Shipment.id,
+            FinancialTransaction.transaction_type == INVOICE_TYPE,
+            FinancialTransaction.status != "cancelled"
+        )
+        .exists()
+    )
+
+
+def invoiceable_shipments(db: Session, shipment_ids: List[int], contract_ids: List[int]):
+    return db.execute(
+        select(
+            Shipment.id,
+            Shipment.contract_id,
+            func.coalesce(Shipment.agency_id, Contract.agency_id).label("agency_id"),
+            Contract.total_value,
+            Contract.currency,
+            Agency.payment_terms
+        )
+        .select_from(Shipment)
+        .join(Contract, Shipment.contract_id == Contract.id)
+        .outerjoin(Agency, Agency.id == func.coalesce(Shipment.agency_id, Contract.agency_id))
+        .where(
+            or_(Shipment.id.in_(shipment_ids), Shipment.contract_id.in_(contract_ids)),
+            ~active_invoice_exists()
+        )
+        .order_by(Shipment.id)
+    ).mappings().all()
+
+
+def contract_quantities(db: Session, contract_ids: List[int]) -> Dict[int, List[Tuple[int, int]]]:
+    """Every shipment of each contract as ``(shipment_id, quantity in cents)``, in id order."""
+    quantities: Dict[int, List[Tuple[int, int]]] = {}
+    rows = db.execute(
+        select(Shipment.contract_id, Shipment.id, Shipment.quantity)
+        .where(Shipment.contract_id.in_(contract_ids))
+        .order_by(Shipment.contract_id, Shipment.id)
+    ).all()
+    for contract_id, shipment_id, quantity in rows:
+        quantities.setdefault(contract_id, []).append((shipment_id, to_cents(quantity)))
+    return quantities
+
+
+def split_contract_value(contract_value: int, quantities: List[Tuple[int, int]]) -> Dict[int, int]:
+    """
+    Split ``contract_value`` (cents) across a contract's shipments.
+
+    Shares follow quantity only when every shipment has one, otherwise
+    they are equal. The last shipment takes the rounding remainder, so
+    the amounts always add up to the contract value.
+    """
+    if all(quantity > 0 for _, quantity in quantities):
+        weights = [quantity for _, quantity in quantities]
+    else:
+        weights = [1] * len(quantities)
+    total_weight = sum(weights)
+
+    amounts = {}
+    allocated = 0
+    for (shipment_id, _), weight in zip(quantities[:-1], weights):
+        amounts[shipment_id] = div_round(contract_value * weight, total_weight)
+        allocated += amounts[shipment_id]
+    amounts[quantities[-1][0]] = contract_value - allocated
+    return amounts
+
+
+def _insert_ignoring_invoiced(db: Session, table):
+    """
+    INSERT that skips shipments which already have a live invoice, i.e.
+    conflicts on ``uq_financial_transaction_shipment_invoice`` only; any
+    other unique violation still raises.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        return (postgresql if dialect == "postgresql" else sqlite).insert(table).on_conflict_do_nothing(
+            index_elements=[table.c.shipment_id],
+            index_where=and_(table.c.transaction_type == INVOICE_TYPE, table.c.status != "cancelled")
+        )
+    return insert(table)
+
+
+def generate_invoices(
+    db: Session,
+    shipment_ids: Optional[List[int]] = None,
+    contract_ids: Optional[List[int]] = None,
+    tax_rate: Decimal = Decimal("0"),
+    discount_rate: Decimal = Decimal("0"),
+    invoice_date: Optional[date] = None,
+    user_id: Optional[int] = None
+) -> dict:
+    """
+    Raise one invoice per shipment for the given shipments and/or every
+    shipment of the given contracts.
+
+    The contract value is split across all of its shipments by quantity
+    (evenly when any shipment has no quantity); tax and discount are percentages of the
+    local amount. All invoices and their ``create`` history rows are
+    inserted in one transaction, numbered from one reserved block.
+    Shipments that already have a live invoice are skipped, so
+    re-running is safe.
+    """
+    shipment_ids = list(shipment_ids or [])
+    contract_ids = list(contract_ids or [])
+    if not shipment_ids and not contract_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No shipments or contracts given")
+
+    now = datetime.now(UTC)
+    invoice_date = invoice_date or now.date()
+    tax_rate_cents = to_cents(tax_rate)
+    discount_rate_cents = to_cents(discount_rate)
+
+    shipments = invoiceable_shipments(db, shipment_ids, contract_ids)
+    quantities = contract_quantities(db, list({row["contract_id"] for row in shipments}))
+    splits: Dict[int, Dict[int, int]] = {}
+
+    rows = []
+    skipped = []
+    for shipment in shipments:
+        if shipment["total_value"] is None:
+            skipped.append({"shipment_id": shipment["id"], "detail": "Contract has no total value"})
+            continue
+
+        currency = shipment["currency"] or "IDR"
+        rate = exchange_rate_cache.rate_int(db, currency, invoice_date)
+        if rate is None:
+            skipped.append({"shipment_id": shipment["id"], "detail": f"No exchange rate for {currency}"})
+            continue
+
+        contract_id = shipment["contract_id"]
+        if contract_id not in splits:
+            splits[contract_id] = split_contract_value(to_cents(shipment["total_value"]), quantities[contract_id])
+        amount = splits[contract_id][shipment["id"]]
+
+        amount_local = div_round(amount * rate, RATE_SCALE)
+        tax_amount = div_round(amount_local * tax_rate_cents, PERCENT_SCALE)
+        discount_amount = div_round(amount_local * discount_rate_cents, PERCENT_SCALE)
+        terms = shipment["payment_terms"] or INVOICE_DEFAULT_PAYMENT_TERMS
+
+        rows.append({
+            "contract_id": shipment["contract_id"],
+            "shipment_id": shipment["id"],
+            "agency_id": shipment["agency_id"],
+            "transaction_type": INVOICE_TYPE,
+            "amount": from_cents(amount),
+            "currency": currency,
+            "exchange_rate": Decimal(rate).scaleb(-6),
+            "amount_local": from_cents(amount_local),
+            "tax_rate": from_cents(tax_rate_cents),
+            "tax_amount": from_cents(tax_amount),
+            "discount_amount": from_cents(discount_amount),
+            "total_amount": from_cents(amount_local + tax_amount - discount_amount),
+            "due_date": invoice_date + timedelta(days=terms),
+            "status": INVOICE_STATUS,
+            "created_by": user_id,
+            "created_at": now,
+            "updated_at": now,
+        })
+
+    created = []
+    if rows:
+        numbers = allocate_document_numbers("invoice", len(rows), invoice_date.year)
+        for row, number in zip(rows, numbers):
+            row["transaction_number"] = number
+
+        ledger = FinancialTransaction.__table__
+        try:
+            inserted = db.execute(
+                _insert_ignoring_invoiced(db, ledger).returning(ledger.c.id, ledger.c.shipment_id),
+                rows
+            ).all()
+            ids = {shipment_id: transaction_id for transaction_id, shipment_id in inserted}
+            created = [dict(row, id=ids[row["shipment_id"]]) for row in rows if row["shipment_id"] in ids]
+            skipped.extend(
+                {"shipment_id": row["shipment_id"], "detail": "Already invoiced"}
+                for row in rows if row["shipment_id"] not in ids
+            )
+
+            if created:
+                db.execute(insert(WorkflowHistory.__table__), [
+                    {
+                        "entity_type": "transaction",
+                        "entity_id": row["id"],
+                        "action": "create",
+                        "to_status": INVOICE_STATUS,
+                        "user_id": user_id,
+                        "department": "finance",
+                        "remarks": f"Invoice for shipment {row['shipment_id']}",
+                    }
+                    for row in created
+                ])
+
+                deltas = []
+                for row in created:
+                    deltas.extend(transition_deltas(None, {field: row[field] for field in TRACKED_FIELDS}))
+                apply_rollup_deltas(db, deltas)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    return {
+        "created": [
+            {"shipment_id": row["shipment_id"], "id": row["id"], "transaction_number": row["transaction_number"]}
+            for row in created
+        ],
+        "skipped": sorted(skipped, key=lambda item: item["shipment_id"])
+    }
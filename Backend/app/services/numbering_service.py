@@ -0,0 +1,133 @@
+import os
+import re
+import threading
+from datetime import datetime, UTC
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import text, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.database import engine
+from app.models import DocumentCounter
+
+NUMBER_BLOCK_SIZE = int(os.getenv("NUMBER_BLOCK_SIZE", 50))
+NUMBER_BACKEND = os.getenv("NUMBER_BACKEND", "auto").lower()
+
+DOCUMENT_PREFIXES = {
+    "contract": "CTR",
+    "shipment": "SHP",
+    "invoice": "INV",
+    "transaction": "TRX",
+}
+
+
+def format_document_number(entity: str, year: int, number: int) -> str:
+    return f"{DOCUMENT_PREFIXES[entity]}-{year}-{number:06d}"
+
+
+class NumberAllocator:
+    """
+    Hands out per-entity, per-year document numbers from blocks reserved
+    in the database, so concurrent creators never race on a unique index.
+
+    On PostgreSQL each (entity, year) has its own sequence with
+    ``INCREMENT BY block_size``: one ``nextval`` reserves a whole block.
+    Elsewhere a ``document_counters`` row is advanced by ``block_size``
+    with ``UPDATE ... RETURNING``. Reservations run on their own short
+    transaction, so they are never rolled back with the caller's work;
+    numbers left in a block when the process exits are skipped, leaving
+    gaps but never duplicates.
+    """
+
+    def __init__(self, block_size: int = NUMBER_BLOCK_SIZE, backend: str = NUMBER_BACKEND):
+        self.block_size = block_size
+        self.backend = backend
+        self._blocks: Dict[Tuple[str, int], List[int]] = {}
+        self._increments: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _uses_sequences(self) -> bool:
+        if self.backend == "auto":
+            return engine.dialect.name == "postgresql"
+        return self.backend == "sequence"
+
+    def _reserve_from_sequence(self, conn, entity: str, year: int) -> Tuple[int, int]:
+        name = f"doc_seq_{entity}_{year}"
+        if not re.fullmatch(r"[a-z_]+_\d{4}", name):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid document entity")
+
+        if name not in self._increments:
+            conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {name} START WITH 1 INCREMENT BY {self.block_size}"))
+            self._increments[name] = conn.execute(
+                text("SELECT increment_by FROM pg_sequences WHERE sequencename = :name"), {"name": name}
+            ).scalar_one()
+
+        start = conn.execute(text(f"SELECT nextval('{name}')")).scalar_one()
+        return start, start + self._increments[name]
+
+    def _reserve_from_counter(self, conn, entity: str, year: int) -> Tuple[int, int]:
+        table = DocumentCounter.__table__
+        advance = (
+            update(table)
+            .where(table.c.entity == entity, table.c.year == year)
+            .values(next_value=table.c.next_value + self.block_size)
+            .returning(table.c.next_value)
+        )
+
+        end = conn.execute(advance).scalar()
+        if end is None:
+            dialect = conn.dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                seed = (postgresql if dialect == "postgresql" else sqlite).insert(table).on_conflict_do_nothing()
+                conn.execute(seed, {"entity": entity, "year": year, "next_value": 1})
+            else:
+                conn.execute(table.insert(), {"entity": entity, "year": year, "next_value": 1})
+            end = conn.execute(advance).scalar_one()
+        return end - self.block_size, end
+
+    def _reserve(self, entity: str, year: int) -> List[int]:
+        with engine.begin() as conn:
+            if self._uses_sequences():
+                start, end = self._reserve_from_sequence(conn, entity, year)
+            else:
+                start, end = self._reserve_from_counter(conn, entity, year)
+        return [start, end]
+
+    def allocate(self, entity: str, count: int = 1, year: Optional[int] = None) -> List[int]:
+        if entity not in DOCUMENT_PREFIXES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown document type '{entity}'"
+            )
+
+        year = year or datetime.now(UTC).year
+        key = (entity, year)
+        numbers: List[int] = []
+        with self._lock:
+            while len(numbers) < count:
+                block = self._blocks.get(key)
+                if block is None or block[0] >= block[1]:
+                    block = self._blocks[key] = self._reserve(entity, year)
+                take = min(count - len(numbers), block[1] - block[0])
+                numbers.extend(range(block[0], block[0] + take))
+                block[0] += take
+        return numbers
+
+    def reset(self) -> None:
+        with self._lock:
+            self._blocks.clear()
+            self._increments.clear()
+
+
+number_allocator = NumberAllocator()
+
+
+def next_document_number(entity: str, year: Optional[int] = None) -> str:
+    year = year or datetime.now(UTC).year
+    return format_document_number(entity, year, number_allocator.allocate(entity, 1, year)[0])
+
+
+def allocate_document_numbers(entity: str, count: int, year: Optional[int] = None) -> List[str]:
+    year = year or datetime.now(UTC).year
+    return [format_document_number(entity, year, number) for number in number_allocator.allocate(entity, count, year)]
@@ -0,0 +1,125 @@
+import logging
+import os
+from datetime import date, datetime, UTC
+from typing import Optional
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models import FinancialTransaction, WorkflowHistory
+from app.services.finance_rollup_service import (
+    TRACKED_FIELDS, apply_rollup_deltas, tracked_columns, transition_deltas
+)
+
+logger = logging.getLogger(__name__)
+
+OVERDUE_CHUNK_SIZE = int(os.getenv("OVERDUE_CHUNK_SIZE", 500))
+OVERDUE_SOURCE_STATUSES = ("pending", "issued")
+OVERDUE_STATUS = "overdue"
+
+
+def overdue_candidates(as_of: date, after_id: int, limit: int):
+    return (
+        select(FinancialTransaction.id, FinancialTransaction.due_date, *tracked_columns())
+        .where(
+            FinancialTransaction.status.in_(OVERDUE_SOURCE_STATUSES),
+            FinancialTransaction.due_date < as_of,
+            FinancialTransaction.id > after_id
+        )
+        .order_by(FinancialTransaction.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+
+
+def mark_overdue_chunk(db: Session, rows, user_id: Optional[int] = None) -> int:
+    """
+    Flip one locked chunk to ``overdue``, bump the reminder counters, write
+    the ``remind`` history rows and the rollup deltas, then commit so the
+    row locks are released before the next chunk is read.
+    """
+    now = datetime.now(UTC)
+    ids = [row["id"] for row in rows]
+
+    try:
+        updated = db.execute(
+            update(FinancialTransaction.__table__)
+            .where(
+                FinancialTransaction.__table__.c.id.in_(ids),
+                FinancialTransaction.__table__.c.status.in_(OVERDUE_SOURCE_STATUSES)
+            )
+            .values(
+                status=OVERDUE_STATUS,
+                reminder_sent=True,
+                reminder_count=func.coalesce(FinancialTransaction.__table__.c.reminder_count, 0) + 1,
+                last_reminder_date=now,
+                updated_at=now
+            )
+            .returning(FinancialTransaction.__table__.c.id)
+        ).scalars().all()
+
+        updated_ids = set(updated)
+        changed = [row for row in rows if row["id"] in updated_ids]
+        if changed:
+            db.execute(insert(WorkflowHistory.__table__), [
+                {
+                    "entity_type": "transaction",
+                    "entity_id": row["id"],
+                    "action": "remind",
+                    "from_status": row["status"],
+                    "to_status": OVERDUE_STATUS,
+                    "user_id": user_id,
+                    "department": "finance",
+                    "remarks": f"Overdue since {row['due_date']}",
+                }
+                for row in changed
+            ])
+
+            deltas = []
+            for row in changed:
+                before = {field: row[field] for field in TRACKED_FIELDS}
+                deltas.extend(transition_deltas(before, dict(before, status=OVERDUE_STATUS)))
+            apply_rollup_deltas(db, deltas)
+
+        db.commit()
+        return len(changed)
+    except Exception:
+        db.rollback()
+        raise
+
+
+def mark_overdue_transactions(
+    db: Session,
+    as_of: Optional[date] = None,
+    chunk_size: int = OVERDUE_CHUNK_SIZE,
+    user_id: Optional[int] = None,
+    max_chunks: Optional[int] = None
+) -> dict:
+    """
+    Sweep pending/issued transactions whose ``due_date`` is before
+    ``as_of`` in id-ordered chunks of ``chunk_size``.
+
+    Each chunk is read with ``FOR UPDATE SKIP LOCKED`` and committed on
+    its own, so memory is bounded by one chunk and no row lock outlives
+    its chunk. Rows locked by API requests are skipped and picked up by
+    the next run.
+    """
+    as_of = as_of or date.today()
+    last_id = 0
+    chunks = 0
+    scanned = 0
+    marked = 0
+
+    while max_chunks is None or chunks < max_chunks:
+        rows = db.execute(overdue_candidates(as_of, last_id, chunk_size)).mappings().all()
+        if not rows:
+            db.commit()
+            break
+
+        last_id = rows[-1]["id"]
+        scanned += len(rows)
+        marked += mark_overdue_chunk(db, rows, user_id)
+        chunks += 1
+        logger.debug("Overdue sweep chunk %d: up to id %d, %d marked so far", chunks, last_id, marked)
+
+    return {"as_of": as_of.isoformat(), "chunks": chunks, "scanned": scanned, "marked": marked, "last_id": last_id}
@@ -0,0 +1,74 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import List, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import tuple_
+
+MAX_PAGE_SIZE = 500
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _decode_value(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the requested ordering")
+        return tuple(_decode_value(column, value) for column, value in zip(columns, values))
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+
+def keyset_paginate(query, columns: Sequence, cursor: Optional[str] = None, limit: int = 100) -> dict:
+    """
+    Fetch one page of ``query`` ordered by ``columns`` (the last of which
+    must be unique), starting strictly after ``cursor``.
+
+    Returns ``{"items": [...], "next_cursor": str | None}``. The cursor is
+    opaque to clients and seeks straight to the next row, so deep pages
+    cost the same as the first one.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        if len(columns) == 1:
+            query = query.filter(columns[0] > values[0])
+        else:
+            query = query.filter(tuple_(*columns) > tuple_(*values))
+
+    rows: List = query.order_by(*columns).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+
+    return {"items": rows, "next_cursor": next_cursor}
@@ -0,0 +1,96 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+ALL_PERMISSIONS = -1
+
+
+def flatten_permissions(permissions) -> Tuple[bool, List[str]]:
+    """
+    Turn a ``Role.permissions`` JSON value into permission names.
+
+    ``{"contracts": ["create", "view"]}`` yields ``contracts``,
+    ``contracts:create`` and ``contracts:view``. Returns ``(True, [])``
+    for the ``{"all": true}`` superuser grant.
+    """
+    if not permissions:
+        return False, []
+
+    if isinstance(permissions, dict):
+        if permissions.get("all") is True:
+            return True, []
+        names = []
+        for resource, actions in permissions.items():
+            if actions is False:
+                continue
+            names.append(resource)
+            if isinstance(actions, (list, tuple)):
+                names.extend(f"{resource}:{action}" for action in actions)
+        return False, names
+
+    return False, [str(name) for name in permissions]
+
+
+class PermissionRegistry:
+    """
+    Assigns every permission name a bit and compiles roles into masks.
+
+    Role masks are cached by role id together with the role's
+    ``updated_at`` so an edited role is recompiled on next use.
+    """
+
+    def __init__(self):
+        self._bits: Dict[str, int] = {}
+        self._required_masks: Dict[Tuple[str, ...], int] = {}
+        self._role_masks: Dict[int, Tuple[object, int]] = {}
+        self._lock = threading.Lock()
+
+    def bit(self, name: str) -> int:
+        bit = self._bits.get(name)
+        if bit is None:
+            with self._lock:
+                bit = self._bits.get(name)
+                if bit is None:
+                    bit = 1 << len(self._bits)
+                    self._bits[name] = bit
+        return bit
+
+    def mask_for(self, names: Iterable[str]) -> int:
+        key = tuple(names)
+        mask = self._required_masks.get(key)
+        if mask is None:
+            mask = 0
+            for name in key:
+                mask |= self.bit(name)
+            self._required_masks[key] = mask
+        return mask
+
+    def names_for(self, mask: int) -> List[str]:
+        return [name for name, bit in self._bits.items() if mask & bit]
+
+    def role_mask(self, role) -> int:
+        if role is None:
+            return 0
+
+        version = getattr(role, "updated_at", None)
+        cached = self._role_masks.get(role.id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        grants_all, names = flatten_permissions(role.permissions)
+        mask = ALL_PERMISSIONS if grants_all else self.mask_for(names)
+        self._role_masks[role.id] = (version, mask)
+        return mask
+
+    def invalidate_role(self, role_id: Optional[int] = None) -> None:
+        with self._lock:
+            if role_id is None:
+                self._role_masks.clear()
+            else:
+                self._role_masks.pop(role_id, None)
+
+
+permission_registry = PermissionRegistry()
+
+
+def invalidate_role_permissions(role_id: Optional[int] = None) -> None:
+    permission_registry.invalidate_role(role_id)
@@ -0,0 +1,222 @@
+import logging
+import os
+from array import array
+from datetime import date, datetime, UTC
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from app.models import FinancialTransaction
+from app.services.exchange_rate_service import RATE_SCALE, exchange_rate_cache, rate_to_int
+from app.services.finance_rollup_service import (
+    TRACKED_FIELDS, apply_rollup_deltas, tracked_columns, transition_deltas
+)
+
+logger = logging.getLogger(__name__)
+
+REVALUATION_CHUNK_SIZE = int(os.getenv("REVALUATION_CHUNK_SIZE", 5000))
+CENT_SCALE = 100
+PERCENT_SCALE = 100 * 100
+
+
+def to_cents(value) -> int:
+    if value is None:
+        return 0
+    return int(Decimal(value).scaleb(2).to_integral_value())
+
+
+def from_cents(value: int) -> Decimal:
+    return Decimal(value).scaleb(-2)
+
+
+def div_round(numerator: int, denominator: int) -> int:
+    """Integer division rounding half away from zero, like ``ROUND_HALF_UP``."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+class RevaluationBatch:
+    """
+    One chunk of transactions held column-wise as fixed-point integer
+    arrays (cents for money, 1e-6 for rates, 1e-4 for tax percentages).
+
+    ``compute`` derives every output column in a handful of passes over
+    the arrays, so the result is exactly what per-row ``Decimal`` math
+    with ``ROUND_HALF_UP`` to two places would give.
+    """
+
+    def __init__(self, rows: List[dict]):
+        self.rows = rows
+        self.ids = array("q", (row["id"] for row in rows))
+        self.amount = array("q", (to_cents(row["amount"]) for row in rows))
+        self.tax_rate = array("q", (to_cents(row["tax_rate"]) for row in rows))
+        self.discount = array("q", (to_cents(row["discount_amount"]) for row in rows))
+        self.rate = array("q", bytes(8 * len(rows)))
+        self.amount_local = array("q")
+        self.tax_amount = array("q")
+        self.total_amount = array("q")
+
+    def resolve_rates(self, db: Session, rate_date: Optional[date]) -> List[int]:
+        """Fill ``rate`` from the cache; return the positions with no known rate."""
+        memo: Dict[Tuple[str, date], Optional[int]] = {}
+        today = datetime.now(UTC).date()
+        missing = []
+        for position, row in enumerate(self.rows):
+            on_date = rate_date or (row["created_at"].date() if row["created_at"] else today)
+            key = (row["currency"], on_date)
+            if key not in memo:
+                memo[key] = exchange_rate_cache.rate_int(db, row["currency"], on_date)
+            rate = memo[key]
+            if rate is None:
+                missing.append(position)
+            else:
+                self.rate[position] = rate
+        return missing
+
+    def compute(self) -> None:
+        self.amount_local = array("q", (
+            div_round(amount * rate, RATE_SCALE) for amount, rate in zip(self.amount, self.rate)
+        ))
+        self.tax_amount = array("q", (
+            div_round(local * tax_rate, PERCENT_SCALE) for local, tax_rate in zip(self.amount_local, self.tax_rate)
+        ))
+        self.total_amount = array("q", (
+            local + tax - discount
+            for local, tax, discount in zip(self.amount_local, self.tax_amount, self.discount)
+        ))
+
+    def changes(self, skip: Iterable[int] = ()) -> List[dict]:
+        skip = set(skip)
+        changed = []
+        for position, row in enumerate(self.rows):
+            if position in skip:
+                continue
+            values = {
+                "exchange_rate": Decimal(self.rate[position]).scaleb(-6),
+                "amount_local": from_cents(self.amount_local[position]),
+                "tax_amount": from_cents(self.tax_amount[position]),
+                "total_amount": from_cents(self.total_amount[position]),
+            }
+            if (
+                rate_to_int(row["exchange_rate"] or 0) != self.rate[position]
+                or to_cents(row["amount_local"]) != self.amount_local[position]
+                or to_cents(row["tax_amount"]) != self.tax_amount[position]
+                or to_cents(row["total_amount"]) != self.total_amount[position]
+            ):
+                changed.append(dict(values, b_id=self.ids[position], position=position))
+        return changed
+
+
+def revaluation_candidates(
+    after_id: int,
+    limit: int,
+    currency: Optional[str] = None,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    statuses: Optional[Iterable[str]] = None
+):
+    query = (
+        select(
+            FinancialTransaction.id,
+            FinancialTransaction.exchange_rate,
+            FinancialTransaction.tax_rate,
+            FinancialTransaction.tax_amount,
+            FinancialTransaction.discount_amount,
+            *tracked_columns()
+        )
+        .where(FinancialTransaction.id > after_id, FinancialTransaction.amount.is_not(None))
+        .order_by(FinancialTransaction.id)
+        .limit(limit)
+        .with_for_update()
+    )
+    if currency is not None:
+        query = query.where(FinancialTransaction.currency == currency)
+    if period_from is not None:
+        query = query.where(FinancialTransaction.created_at >= period_from)
+    if period_to is not None:
+        query = query.where(FinancialTransaction.created_at < period_to)
+    if statuses is not None:
+        query = query.where(FinancialTransaction.status.in_(list(statuses)))
+    return query
+
+
+def revalue_transactions(
+    db: Session,
+    rate_date: Optional[date] = None,
+    currency: Optional[str] = None,
+    period_from: Optional[date] = None,
+    period_to: Optional[date] = None,
+    statuses: Optional[Iterable[str]] = None,
+    chunk_size: int = REVALUATION_CHUNK_SIZE
+) -> dict:
+    """
+    Recompute ``exchange_rate``, ``amount_local``, ``tax_amount`` and
+    ``total_amount`` (all in the base currency) for the matching
+    transactions, one committed chunk at a time.
+
+    With ``rate_date`` every row is converted at that day's rate (month-end
+    revaluation); otherwise each row uses the rate of its own transaction
+    date. Rows without a known rate are left untouched and counted.
+    """
+    table = FinancialTransaction.__table__
+    write = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .values(
+            exchange_rate=bindparam("exchange_rate"),
+            amount_local=bindparam("amount_local"),
+            tax_amount=bindparam("tax_amount"),
+            total_amount=bindparam("total_amount"),
+            updated_at=bindparam("updated_at")
+        )
+    )
+
+    last_id = 0
+    scanned = 0
+    updated = 0
+    missing_rates = 0
+
+    while True:
+        rows = db.execute(
+            revaluation_candidates(last_id, chunk_size, currency, period_from, period_to, statuses)
+        ).mappings().all()
+        if not rows:
+            db.commit()
+            break
+
+        last_id = rows[-1]["id"]
+        scanned += len(rows)
+
+        batch = RevaluationBatch(rows)
+        missing = batch.resolve_rates(db, rate_date)
+        missing_rates += len(missing)
+        batch.compute()
+        changed = batch.changes(skip=missing)
+
+        try:
+            if changed:
+                now = datetime.now(UTC)
+                db.execute(write, [
+                    {key: value for key, value in change.items() if key != "position"} | {"updated_at": now}
+                    for change in changed
+                ])
+
+                deltas = []
+                for change in changed:
+                    before = {field: rows[change["position"]][field] for field in TRACKED_FIELDS}
+                    after = dict(before, amount_local=change["amount_local"], total_amount=change["total_amount"])
+                    deltas.extend(transition_deltas(before, after))
+                apply_rollup_deltas(db, deltas)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        updated += len(changed)
+        logger.debug("Revaluation chunk up to id %d: %d rows changed", last_id, len(changed))
+
+    return {"scanned": scanned, "updated": updated, "missing_rates": missing_rates, "last_id": last_id}
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.user import Role
+from app.services.permission_service import invalidate_role_permissions
+
+ROLE_REGISTRY_CHECK_INTERVAL = float(os.getenv("ROLE_REGISTRY_CHECK_INTERVAL", 30))
+
+RoleEntry = namedtuple("RoleEntry", ["id", "name", "description", "permissions", "updated_at"])
+
+
+class RoleRegistry:
+    """
+    In-memory copy of the ``roles`` table.
+
+    Loaded once at startup and reloaded when role CRUD calls
+    :meth:`invalidate`, or when the table's version (row count plus latest
+    ``updated_at``) changes. The version probe runs at most once every
+    ``check_interval`` seconds, so other workers' role edits are picked up
+    without a per-request query.
+    """
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._by_id: Dict[int, RoleEntry] = {}
+        self._by_name: Dict[str, RoleEntry] = {}
+        self._version = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._checked_at is not None
+
+    def _fetch_version(self, db: Session):
+        return tuple(db.execute(select(func.count(Role.id), func.max(Role.updated_at))).one())
+
+    def load(self, db: Session) -> None:
+        version = self._fetch_version(db)
+        entries = [
+            RoleEntry(role.id, role.name, role.description, role.permissions, role.updated_at)
+            for role in db.execute(select(Role)).scalars()
+        ]
+        with self._lock:
+            self._by_id = {entry.id: entry for entry in entries}
+            self._by_name = {entry.name: entry for entry in entries}
+            self._version = version
+            self._checked_at = time.monotonic()
+        invalidate_role_permissions()
+
+    def ensure_current(self, db: Session) -> None:
+        if not self.loaded:
+            self.load(db)
+            return
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        if self._fetch_version(db) != self._version:
+            self.load(db)
+        else:
+            self._checked_at = time.monotonic()
+
+    async def ensure_current_async(self, db: AsyncSession) -> None:
+        checked_at = self._checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.check_interval:
+            return
+        await db.run_sync(self.ensure_current)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._checked_at = None
+
+    def get(self, db: Session, role_id: Optional[int]) -> Optional[RoleEntry]:
+        if role_id is None:
+            return None
+        self.ensure_current(db)
+        entry = self._by_id.get(role_id)
+        if entry is None and self._fetch_version(db) != self._version:
+            self.load(db)
+            entry = self._by_id.get(role_id)
+        return entry
+
+    def get_by_name(self, db: Session, name: str) -> Optional[RoleEntry]:
+        self.ensure_current(db)
+        return self._by_name.get(name)
+
+    def peek(self, role_id: Optional[int]) -> Optional[RoleEntry]:
+        if role_id is None:
+            return None
+        return self._by_id.get(role_id)
+
+    def all(self, db: Session) -> List[RoleEntry]:
+        self.ensure_current(db)
+        return sorted(self._by_id.values(), key=lambda entry: entry.id)
+
+
+role_registry = RoleRegistry(ROLE_REGISTRY_CHECK_INTERVAL)
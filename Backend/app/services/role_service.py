@@ -0,0 +1,66 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from fastapi import HTTPException, status
+from typing import List, Optional
+from app.models.user import User, Role
+from app.schemasPy import RoleCreate, RoleUpdate
+from app.services.role_registry import role_registry, RoleEntry
+
+def get_roles(db: Session) -> List[RoleEntry]:
+    return role_registry.all(db)
+
+def get_role(db: Session, role_id: int) -> Optional[RoleEntry]:
+    return role_registry.get(db, role_id)
+
+def get_role_by_name(db: Session, name: str) -> Optional[RoleEntry]:
+    return role_registry.get_by_name(db, name)
+
+def create_role(db: Session, role_data: RoleCreate) -> Role:
+    db_role = Role(**role_data.model_dump())
+    db.add(db_role)
+    
+    try:
+        db.commit()
+        db.refresh(db_role)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Role name already exists")
+    
+    role_registry.invalidate()
+    return db_role
+
+def update_role(db: Session, role_id: int, role_data: RoleUpdate) -> Role:
+    db_role = db.query(Role).filter(Role.id == role_id).first()
+    if not db_role:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
+    
+    for field, value in role_data.model_dump(exclude_unset=True).items():
+        setattr(db_role, field, value)
+    
+    try:
+        db.commit()
+        db.refresh(db_role)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Role name already exists")
+    
+    role_registry.invalidate()
+    return db_role
+
+def delete_role(db: Session, role_id: int) -> bool:
+    db_role = db.query(Role).filter(Role.id == role_id).first()
+    if not db_role:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Role not found")
+    
+    if db.query(User.id).filter(User.role_id == role_id).first():
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Role is still assigned to users")
+    
+    db.delete(db_role)
+    try:
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete role")
+    
+    role_registry.invalidate()
+    return True
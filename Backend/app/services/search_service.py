@@ -0,0 +1,177 @@
+import os
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, literal, or_
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto").lower()
+SEARCH_FIELDS = ("username", "email", "first_name", "last_name")
+NGRAM_SIZE = 3
+
+
+def trigrams(text: Optional[str]) -> Set[str]:
+    """
+    pg_trgm-style trigrams: lower-cased, each word padded with two leading
+    spaces and one trailing space.
+    """
+    grams = set()
+    if not text:
+        return grams
+    for word in text.lower().split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1))
+    return grams
+
+
+def substring_grams(text: str) -> Set[str]:
+    text = text.lower()
+    return {text[i:i + NGRAM_SIZE] for i in range(len(text) - NGRAM_SIZE + 1)}
+
+
+def similarity(left: Set[str], right: Set[str]) -> float:
+    if not left or not right:
+        return 0.0
+    return len(left & right) / len(left | right)
+
+
+class NgramIndex:
+    """
+    In-process trigram inverted index over the searchable user columns.
+
+    Used when the database has no pg_trgm (SQLite in local testing). A
+    query's substring trigrams narrow the candidates through the postings
+    lists; candidates are then confirmed with a real substring match and
+    ranked by trigram similarity, mirroring the PostgreSQL backend.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._fields: Dict[int, Tuple[str, ...]] = {}
+        self._field_grams: Dict[int, Tuple[Set[str], ...]] = {}
+        self._lock = threading.RLock()
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._fields)
+
+    def build(self, rows: Iterable[Tuple]) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._fields.clear()
+            self._field_grams.clear()
+            for row in rows:
+                self._add(row[0], tuple(value or "" for value in row[1:]))
+            self.loaded = True
+
+    def upsert(self, user_id: int, values: Tuple[str, ...]) -> None:
+        with self._lock:
+            self._remove(user_id)
+            self._add(user_id, tuple(value or "" for value in values))
+
+    def remove(self, user_id: int) -> None:
+        with self._lock:
+            self._remove(user_id)
+
+    def _add(self, user_id: int, values: Tuple[str, ...]) -> None:
+        self._fields[user_id] = tuple(value.lower() for value in values)
+        self._field_grams[user_id] = tuple(trigrams(value) for value in values)
+        for value in values:
+            for gram in substring_grams(value):
+                self._postings.setdefault(gram, set()).add(user_id)
+
+    def _remove(self, user_id: int) -> None:
+        values = self._fields.pop(user_id, None)
+        self._field_grams.pop(user_id, None)
+        if values is None:
+            return
+        for value in values:
+            for gram in substring_grams(value):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(user_id)
+                    if not postings:
+                        del self._postings[gram]
+
+    def search(self, query: str, limit: int = 100, offset: int = 0) -> List[Tuple[int, float]]:
+        needle = query.lower().strip()
+        if not needle:
+            return []
+
+        with self._lock:
+            query_grams = substring_grams(needle)
+            if query_grams:
+                postings = sorted((self._postings.get(gram, set()) for gram in query_grams), key=len)
+                candidates = set(postings[0])
+                for posting in postings[1:]:
+                    candidates &= posting
+                    if not candidates:
+                        break
+            else:
+                candidates = set(self._fields)
+
+            ranked_query = trigrams(needle)
+            results = []
+            for user_id in candidates:
+                values = self._fields[user_id]
+                if not any(needle in value for value in values):
+                    continue
+                score = max(similarity(ranked_query, grams) for grams in self._field_grams[user_id])
+                results.append((user_id, score))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results[offset:offset + limit]
+
+
+user_search_index = NgramIndex()
+
+
+def search_values(user: User) -> Tuple[str, ...]:
+    return tuple(getattr(user, field) for field in SEARCH_FIELDS)
+
+
+def uses_postgres_search(db: Session) -> bool:
+    if SEARCH_BACKEND == "ngram":
+        return False
+    if SEARCH_BACKEND == "postgres":
+        return True
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def load_search_index(db: Session) -> NgramIndex:
+    columns = [User.id] + [getattr(User, field) for field in SEARCH_FIELDS]
+    user_search_index.build(db.query(*columns).yield_per(5000))
+    return user_search_index
+
+
+def index_user(user: User) -> None:
+    if user_search_index.loaded:
+        user_search_index.upsert(user.id, search_values(user))
+
+
+def index_user_row(user_id: int, row: dict) -> None:
+    if user_search_index.loaded:
+        user_search_index.upsert(user_id, tuple(row.get(field) for field in SEARCH_FIELDS))
+
+
+def search_users_ranked(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[User]:
+    if uses_postgres_search(db):
+        pattern = f"%{query}%"
+        score = func.greatest(
+            *(func.similarity(getattr(User, field), literal(query)) for field in SEARCH_FIELDS)
+        ).label("score")
+        rows = db.query(User, score).filter(
+            or_(*(getattr(User, field).ilike(pattern) for field in SEARCH_FIELDS))
+        ).order_by(score.desc(), User.id).offset(skip).limit(limit).all()
+        return [user for user, _ in rows]
+
+    if not user_search_index.loaded:
+        load_search_index(db)
+
+    ranked = user_search_index.search(query, limit=limit, offset=skip)
+    if not ranked:
+        return []
+    users = {user.id: user for user in db.query(User).filter(User.id.in_([user_id for user_id, _ in ranked]))}
+    return [users[user_id] for user_id, _ in ranked if user_id in users]
@@ -0,0 +1,100 @@
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.models.user import User, Role
+
+USER_STATS_RECONCILE_INTERVAL = float(os.getenv("USER_STATS_RECONCILE_INTERVAL", 300))
+
+
+class UserStatisticsSnapshot:
+    """
+    In-process user counters, kept current by deltas from the user
+    mutation functions and rebuilt by :meth:`reconcile`.
+
+    Deltas only see this worker's writes, so reads reconcile once the
+    snapshot is older than ``reconcile_interval`` seconds.
+    """
+
+    def __init__(self, reconcile_interval: float):
+        self.reconcile_interval = reconcile_interval
+        self.total_users = 0
+        self.active_users = 0
+        self.role_distribution: Dict[str, int] = {}
+        self.reconciled_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_stale(self) -> bool:
+        return self.reconciled_at is None or time.monotonic() - self.reconciled_at > self.reconcile_interval
+
+    def reconcile(self, db: Session) -> None:
+        rows = db.execute(
+            select(
+                Role.name,
+                func.count(User.id),
+                func.coalesce(func.sum(case((User.is_active == True, 1), else_=0)), 0)
+            )
+            .select_from(Role)
+            .join(User, User.role_id == Role.id, full=True)
+            .group_by(Role.name)
+        ).all()
+
+        total_users = 0
+        active_users = 0
+        role_distribution = {}
+        for role_name, count, active in rows:
+            total_users += count
+            active_users += active
+            if role_name is not None:
+                role_distribution[role_name] = count
+
+        with self._lock:
+            self.total_users = total_users
+            self.active_users = active_users
+            self.role_distribution = role_distribution
+            self.reconciled_at = time.monotonic()
+
+    def user_created(self, role_name: Optional[str], is_active: bool = True) -> None:
+        with self._lock:
+            self.total_users += 1
+            if is_active:
+                self.active_users += 1
+            if role_name is not None:
+                self.role_distribution[role_name] = self.role_distribution.get(role_name, 0) + 1
+
+    def activation_changed(self, was_active: bool, is_active: bool) -> None:
+        if was_active == is_active:
+            return
+        with self._lock:
+            self.active_users += 1 if is_active else -1
+
+    def role_changed(self, old_role_name: Optional[str], new_role_name: Optional[str]) -> None:
+        if old_role_name == new_role_name:
+            return
+        with self._lock:
+            if old_role_name is not None:
+                self.role_distribution[old_role_name] = self.role_distribution.get(old_role_name, 0) - 1
+            if new_role_name is not None:
+                self.role_distribution[new_role_name] = self.role_distribution.get(new_role_name, 0) + 1
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "total_users": self.total_users,
+                "active_users": self.active_users,
+                "inactive_users": self.total_users - self.active_users,
+                "role_distribution": dict(self.role_distribution)
+            }
+
+
+user_statistics = UserStatisticsSnapshot(USER_STATS_RECONCILE_INTERVAL)
+
+
+def reconcile_user_statistics(db: Session) -> dict:
+    user_statistics.reconcile(db)
+    return user_statistics.as_dict()
@@ -0,0 +1,114 @@
+from datetime import datetime, UTC
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.models import Contract, Shipment, FinancialTransaction
+from app.services.finance_rollup_service import (
+    apply_rollup_deltas, tracked_columns, transaction_values, transition_deltas
+)
+
+
+def update_returning(db: Session, model, entity_id: int, values: dict, *conditions, commit: bool = True):
+    """
+    Apply ``values`` to one row with a single ``UPDATE ... RETURNING``.
+
+    Extra ``conditions`` make the update conditional (e.g. on the current
+    status). Returns the refreshed ORM object, or ``None`` when no row
+    matched. The returned object stays loaded after the commit, so using
+    it does not cost another SELECT.
+    """
+    stmt = (
+        update(model)
+        .where(model.id == entity_id, *conditions)
+        .values(**values)
+        .returning(model)
+        .execution_options(synchronize_session=False, populate_existing=True)
+    )
+
+    try:
+        instance = db.execute(stmt).scalars().first()
+        if commit:
+            commit_keep_loaded(db)
+        return instance
+    except Exception:
+        db.rollback()
+        raise
+
+
+def commit_keep_loaded(db: Session) -> None:
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        db.commit()
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+def require_updated(db: Session, model, entity_id: int, instance, label: str):
+    if instance is not None:
+        return instance
+
+    exists = db.execute(select(model.id).where(model.id == entity_id)).first()
+    if exists is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"{label} not found")
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{label} was changed by another request or is not in the expected status"
+    )
+
+
+def change_status(
+    db: Session,
+    model,
+    entity_id: int,
+    new_status: str,
+    from_statuses: Optional[Iterable[str]] = None,
+    label: str = "Record",
+    **values
+):
+    conditions = []
+    if from_statuses is not None:
+        conditions.append(model.status.in_(list(from_statuses)))
+
+    values.update(status=new_status, updated_at=datetime.now(UTC))
+    instance = update_returning(db, model, entity_id, values, *conditions)
+    return require_updated(db, model, entity_id, instance, label)
+
+
+def change_contract_status(db: Session, contract_id: int, new_status: str, from_statuses: Optional[Iterable[str]] = None, **values):
+    return change_status(db, Contract, contract_id, new_status, from_statuses, "Contract", **values)
+
+
+def change_shipment_status(db: Session, shipment_id: int, new_status: str, from_statuses: Optional[Iterable[str]] = None, **values):
+    return change_status(db, Shipment, shipment_id, new_status, from_statuses, "Shipment", **values)
+
+
+def change_transaction_status(db: Session, transaction_id: int, new_status: str, from_statuses: Optional[Iterable[str]] = None, **values):
+    """
+    Same single-statement update as ``change_status``, plus the matching
+    ``financial_rollups`` delta. The UPDATE bypasses the flush hook, so
+    the pre-image is read (and locked) first and the delta is applied in
+    the same transaction.
+    """
+    conditions = []
+    if from_statuses is not None:
+        conditions.append(FinancialTransaction.status.in_(list(from_statuses)))
+    values.update(status=new_status, updated_at=datetime.now(UTC))
+
+    try:
+        before = db.execute(
+            select(*tracked_columns())
+            .where(FinancialTransaction.id == transaction_id)
+            .with_for_update()
+        ).mappings().first()
+        instance = update_returning(db, FinancialTransaction, transaction_id, values, *conditions, commit=False)
+        if instance is not None:
+            apply_rollup_deltas(db, transition_deltas(dict(before), transaction_values(instance)))
+            commit_keep_loaded(db)
+    except Exception:
+        db.rollback()
+        raise
+    return require_updated(db, FinancialTransaction, transaction_id, instance, "Transaction")
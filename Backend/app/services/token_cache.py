@@ -0,0 +1,109 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from typing import Dict, Optional
+
+from app.config.security import SecurityConfig
+from app.services.role_registry import role_registry
+
+
+class UserSnapshot(namedtuple("UserSnapshot", ["id", "username", "role_id", "is_active", "session_id"], defaults=(None,))):
+    __slots__ = ()
+
+    @property
+    def role(self):
+        return role_registry.peek(self.role_id)
+
+
+def token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def snapshot_user(user, session_id: Optional[int] = None) -> UserSnapshot:
+    return UserSnapshot(
+        id=user.id,
+        username=user.username,
+        role_id=user.role_id,
+        is_active=user.is_active,
+        session_id=session_id
+    )
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWTs, keyed on the token digest.
+
+    Entries expire after ``ttl`` seconds or at the token's own ``exp``,
+    whichever comes first, so a cached identity never outlives its token.
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._digests_by_user: Dict[int, set] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token: str) -> Optional[UserSnapshot]:
+        digest = token_digest(token)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= time.monotonic():
+                self._discard(digest)
+                return None
+            self._entries.move_to_end(digest)
+            return snapshot
+
+    def put(self, token: str, snapshot: UserSnapshot, token_exp: Optional[float] = None) -> None:
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+
+        lifetime = self.ttl
+        if token_exp is not None:
+            lifetime = min(lifetime, token_exp - time.time())
+            if lifetime <= 0:
+                return
+
+        digest = token_digest(token)
+        with self._lock:
+            self._discard(digest)
+            self._entries[digest] = (time.monotonic() + lifetime, snapshot)
+            self._digests_by_user.setdefault(snapshot.id, set()).add(digest)
+            while len(self._entries) > self.max_size:
+                oldest = next(iter(self._entries))
+                self._discard(oldest)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            for digest in list(self._digests_by_user.get(user_id, ())):
+                self._discard(digest)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._digests_by_user.clear()
+
+    def _discard(self, digest: str) -> None:
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        user_id = entry[1].id
+        digests = self._digests_by_user.get(user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_user[user_id]
+
+
+token_cache = TokenCache(
+    max_size=SecurityConfig.TOKEN_CACHE_MAX_SIZE,
+    ttl=SecurityConfig.TOKEN_CACHE_TTL_SECONDS
+)
+
+
+def invalidate_user_tokens(user_id: int) -> None:
+    token_cache.invalidate_user(user_id)
@@ -0,0 +1,191 @@
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, identity_key, selectinload
+
+from app.models.user import User
+
+LOADER_KEY = "user_loader"
+ASYNC_LOADER_KEY = "async_user_loader"
+
+
+class UserLoader:
+    """
+    Request-scoped user lookups, attached to the session via ``info``.
+
+    Primary-key lookups go through the session identity map. Username and
+    email lookups are memoised to the user id (misses included) until the
+    session next flushes or rolls back, so one request never runs the same
+    lookup twice. :meth:`load_many` fetches several ids in one IN query.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._ids_by_key: Dict[Tuple[str, str], int] = {}
+        self._missing_keys: Set[Tuple[str, str]] = set()
+        self._missing_ids: Set[int] = set()
+
+    def clear(self) -> None:
+        self._ids_by_key.clear()
+        self._missing_keys.clear()
+        self._missing_ids.clear()
+
+    def _remember(self, user: User) -> None:
+        self._ids_by_key[("username", user.username)] = user.id
+        self._ids_by_key[("email", user.email)] = user.id
+
+    def get(self, user_id: int) -> Optional[User]:
+        if user_id in self._missing_ids:
+            return None
+        user = self.db.get(User, user_id)
+        if user is None:
+            self._missing_ids.add(user_id)
+        else:
+            self._remember(user)
+        return user
+
+    def _get_by(self, field: str, value: str) -> Optional[User]:
+        key = (field, value)
+        if key in self._missing_keys:
+            return None
+        user_id = self._ids_by_key.get(key)
+        if user_id is not None:
+            return self.get(user_id)
+
+        user = self.db.query(User).filter(getattr(User, field) == value).first()
+        if user is None:
+            self._missing_keys.add(key)
+        else:
+            self._remember(user)
+        return user
+
+    def get_by_username(self, username: str) -> Optional[User]:
+        return self._get_by("username", username)
+
+    def get_by_email(self, email: str) -> Optional[User]:
+        return self._get_by("email", email)
+
+    def load_many(self, user_ids: Iterable[int]) -> List[Optional[User]]:
+        user_ids = list(user_ids)
+        wanted = {
+            user_id for user_id in user_ids
+            if user_id not in self._missing_ids and self.db.identity_map.get(identity_key(User, user_id)) is None
+        }
+        if wanted:
+            found = {user.id for user in self.db.query(User).filter(User.id.in_(wanted))}
+            self._missing_ids.update(wanted - found)
+        return [self.get(user_id) for user_id in user_ids]
+
+
+class AsyncUserLoader:
+    """
+    Async counterpart of :class:`UserLoader` that also coalesces
+    concurrent lookups: every key requested before the event loop next
+    runs the dispatcher is answered by one IN query per column.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self._memo: Dict[Tuple[str, object], Optional[User]] = {}
+        self._pending: Dict[Tuple[str, object], asyncio.Future] = {}
+        self._scheduled = False
+        self._task: Optional[asyncio.Task] = None
+
+    def clear(self) -> None:
+        self._memo.clear()
+
+    async def load(self, field: str, value) -> Optional[User]:
+        key = (field, value)
+        if key in self._memo:
+            return self._memo[key]
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            if not self._scheduled:
+                self._scheduled = True
+                loop.call_soon(self._start_dispatch)
+        return await future
+
+    def _start_dispatch(self) -> None:
+        self._task = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        # One dispatcher at a time: an AsyncSession cannot run concurrent
+        # operations, so keys requested while a query is in flight wait for
+        # the next round of this loop instead of starting a second task.
+        try:
+            while self._pending:
+                pending, self._pending = self._pending, {}
+                try:
+                    await self._run_batch(pending)
+                except BaseException:
+                    for future in pending.values():
+                        if not future.done():
+                            future.cancel()
+                    raise
+        finally:
+            self._scheduled = False
+            self._task = None
+
+    async def _run_batch(self, pending: Dict[Tuple[str, object], asyncio.Future]) -> None:
+        by_field: Dict[str, list] = {}
+        for field, value in pending:
+            by_field.setdefault(field, []).append(value)
+
+        for field, values in by_field.items():
+            column = getattr(User, field)
+            try:
+                result = await self.db.execute(
+                    select(User).options(selectinload(User.role)).where(column.in_(values))
+                )
+                found = {getattr(user, field): user for user in result.scalars()}
+            except Exception as exc:
+                for value in values:
+                    future = pending[(field, value)]
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            for value in values:
+                user = found.get(value)
+                self._memo[(field, value)] = user
+                future = pending[(field, value)]
+                if not future.done():
+                    future.set_result(user)
+
+    async def get(self, user_id: int) -> Optional[User]:
+        return await self.load("id", user_id)
+
+    async def get_by_username(self, username: str) -> Optional[User]:
+        return await self.load("username", username)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return await self.load("email", email)
+
+
+def get_user_loader(db: Session) -> UserLoader:
+    loader = db.info.get(LOADER_KEY)
+    if loader is None:
+        loader = db.info[LOADER_KEY] = UserLoader(db)
+    return loader
+
+
+def get_async_user_loader(db: AsyncSession) -> AsyncUserLoader:
+    loader = db.info.get(ASYNC_LOADER_KEY)
+    if loader is None:
+        loader = db.info[ASYNC_LOADER_KEY] = AsyncUserLoader(db)
+    return loader
+
+
+@event.listens_for(Session, "after_flush")
+@event.listens_for(Session, "after_soft_rollback")
+def _clear_user_loaders(session, *args):
+    for key in (LOADER_KEY, ASYNC_LOADER_KEY):
+        loader = session.info.get(key)
+        if loader is not None:
+            loader.clear()
@@ -1,45 +1,113 @@
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from datetime import datetime, UTC
 from getpass import get_user
 from app.models.user import User, Role
 from app.models.auth import UserCreate, UserUpdate
-from app.config.security import get_password_hash, verify_password
-
-def check_last_admin(db: Session, user_id: int) -> None:
-    user = get_user(db, user_id)
-    if user and user.role and user.role.name == "admin":
-        admin_count = db.query(User).join(Role).filter(
-            Role.name == "admin",
-            User.is_active == True,
-            User.id != user_id
-        ).count()
-        if admin_count == 0:
+from app.config.security import get_password_hash
+from app.database import read_only
+from app.services.token_cache import invalidate_user_tokens
+from app.services.hashing_service import hash_password_async, hash_passwords_async, verify_password_async
+from app.services.activity_buffer import activity_buffer
+from app.services.pagination import keyset_paginate
+from app.services.search_service import index_user, index_user_row, search_users_ranked
+from app.services.statistics_service import user_statistics
+from app.services.role_registry import role_registry
+from app.services.user_loader import get_user_loader, get_async_user_loader
+from app.services.status_service import update_returning, require_updated
+
+BULK_INSERT_BATCH_SIZE = 500
+
+def check_last_admin(db: Session, user_id: int, db_user: Optional[User] = None) -> None:
+    user = db_user if db_user is not None else get_user(db, user_id)
+    role = role_registry.get(db, user.role_id) if user else None
+    if role and role.name == "admin":
+        # Locking the admin role row serialises concurrent admin edits until
+        # commit, so two transactions can't each demote "the other" admin.
+        db.execute(select(Role.id).where(Role.id == role.id).with_for_update())
+        other_admin = db.execute(
+            select(User.id).where(
+                User.role_id == role.id,
+                User.is_active == True,
+                User.id != user_id
+            ).limit(1)
+        ).first()
+        if other_admin is None:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Operation denied: Cannot Modify or remove the last active administrator."
             )
 
 def get_user(db: Session, user_id: int) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
+    return get_user_loader(db).get(user_id)
 
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
-    return db.query(User).filter(User.username == username).first()
+    return get_user_loader(db).get_by_username(username)
 
 def get_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email).first()
+    return get_user_loader(db).get_by_email(email)
+
+def get_users_by_ids(db: Session, user_ids: List[int]) -> List[Optional[User]]:
+    return get_user_loader(db).load_many(user_ids)
+
+def get_page_columns(order_by: str = "id") -> tuple:
+    if order_by == "id":
+        return (User.id,)
+    if order_by == "created_at":
+        return (User.created_at, User.id)
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid ordering. Use 'id' or 'created_at'."
+    )
 
+@read_only
 def get_users(db: Session, skip : int = 0, limit: int = 100) -> List[User]:
-    return db.query(User).filter(User.is_active == True).offset(skip).limit(limit).all()
+    return db.query(User).filter(User.is_active == True).order_by(User.id).offset(skip).limit(limit).all()
 
+@read_only
+def get_users_page(db: Session, cursor: Optional[str] = None, limit: int = 100, order_by: str = "id") -> dict:
+    query = db.query(User).filter(User.is_active == True)
+    return keyset_paginate(query, get_page_columns(order_by), cursor, limit)
+
+@read_only
 def get_users_by_role(db: Session, role_id: int, skip:int = 0, limit: int = 100) -> List[User]:
-    return db.query (User).filter(User.role_id == role_id).offset(skip).limit(limit).all()
+    return db.query (User).filter(User.role_id == role_id).order_by(User.id).offset(skip).limit(limit).all()
+
+@read_only
+def get_users_by_role_page(db: Session, role_id: int, cursor: Optional[str] = None, limit: int = 100, order_by: str = "id") -> dict:
+    query = db.query(User).filter(User.role_id == role_id)
+    return keyset_paginate(query, get_page_columns(order_by), cursor, limit)
+
+async def get_user_async(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await get_async_user_loader(db).get(user_id)
+
+async def get_user_by_username_async(db: AsyncSession, username: str) -> Optional[User]:
+    return await get_async_user_loader(db).get_by_username(username)
 
-def create_user(db: Session, user_data: UserCreate) -> User:
+async def get_user_by_email_async(db: AsyncSession, email: str) -> Optional[User]:
+    return await get_async_user_loader(db).get_by_email(email)
+
+async def get_users_async(db: AsyncSession, skip: int = 0, limit: int = 100) -> List[User]:
+    result = await db.execute(
+        select(User).where(User.is_active == True).order_by(User.id).offset(skip).limit(limit)
+    )
+    return list(result.scalars().all())
+
+async def get_users_by_role_async(db: AsyncSession, role_id: int, skip: int = 0, limit: int = 100) -> List[User]:
+    result = await db.execute(
+        select(User).where(User.role_id == role_id).order_by(User.id).offset(skip).limit(limit)
+    )
+    return list(result.scalars().all())
+
+def validate_new_user(db: Session, user_data: UserCreate):
     try:
-        role = db.query(Role).filter(Role.id == user_data.role.id).first()
+        role = role_registry.get(db, user_data.role_id)
         if not role:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -50,8 +118,13 @@ def create_user(db: Session, user_data: UserCreate) -> User:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Username already exists")
         if get_user_by_email(db, user_data.email):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-        
-        hashed_password = get_password_hash(user_data.password)
+        return role
+    except HTTPException:
+        db.rollback()
+        raise
+
+def insert_user(db: Session, user_data: UserCreate, hashed_password: str, role) -> User:
+    try:
         db_user = User(
             **user_data.model_dump(exclude={'password'}),
             password_hash=hashed_password,
@@ -63,25 +136,127 @@ def create_user(db: Session, user_data: UserCreate) -> User:
         db.add(db_user)
         db.commit()
         db.refresh(db_user)
+        index_user(db_user)
+        user_statistics.user_created(role.name, db_user.is_active)
         
         return db_user
     
     except IntegrityError as e:
-        db.rillback()
+        db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User creation failed due to unique violation."
         )
-    except HTTPException:
-        db.rollback()
-        raise
     except Exception:
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Internal server error"
         )
+
+async def create_user(db: Session, user_data: UserCreate) -> User:
+    """
+    Only the bcrypt hash is awaited on the hashing pool; the blocking
+    Session work runs in the threadpool so it never stalls the event loop.
+    """
+    role = await run_in_threadpool(validate_new_user, db, user_data)
+    hashed_password = await hash_password_async(user_data.password)
+    return await run_in_threadpool(insert_user, db, user_data, hashed_password, role)
         
+def validate_bulk_users(db: Session, users_data: List[UserCreate]):
+    errors = {}
+    seen_usernames = set()
+    seen_emails = set()
+    for index, user_data in enumerate(users_data):
+        if user_data.username in seen_usernames:
+            errors[index] = "Duplicate username in request"
+        elif user_data.email in seen_emails:
+            errors[index] = "Duplicate email in request"
+        seen_usernames.add(user_data.username)
+        seen_emails.add(user_data.email)
+
+    roles = {
+        role.id: role
+        for role in (role_registry.get(db, role_id) for role_id in {user_data.role_id for user_data in users_data})
+        if role is not None
+    }
+    existing_usernames = {
+        username for (username,) in db.query(User.username).filter(User.username.in_(seen_usernames))
+    }
+    existing_emails = {
+        email for (email,) in db.query(User.email).filter(User.email.in_(seen_emails))
+    }
+
+    pending = []
+    for index, user_data in enumerate(users_data):
+        if index in errors:
+            continue
+        if user_data.role_id not in roles:
+            errors[index] = "Invalid role ID"
+        elif user_data.username in existing_usernames:
+            errors[index] = "Username already exists"
+        elif user_data.email in existing_emails:
+            errors[index] = "Email already exists"
+        else:
+            pending.append((index, user_data))
+    return errors, roles, pending
+
+def insert_user_rows(db: Session, rows: list, roles: dict, errors: dict, batch_size: int) -> list:
+    created = []
+    try:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            try:
+                with db.begin_nested():
+                    ids = db.scalars(
+                        insert(User).returning(User.id, sort_by_parameter_order=True),
+                        [row for _, row in batch]
+                    ).all()
+                created.extend((index, user_id, row) for (index, row), user_id in zip(batch, ids))
+            except IntegrityError:
+                for index, row in batch:
+                    try:
+                        with db.begin_nested():
+                            user_id = db.scalars(insert(User).returning(User.id), [row]).one()
+                        created.append((index, user_id, row))
+                    except IntegrityError:
+                        errors[index] = "Username or email already exists"
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error during bulk user creation"
+        )
+
+    for _, user_id, row in created:
+        index_user_row(user_id, row)
+        user_statistics.user_created(roles[row["role_id"]].name, True)
+    return created
+
+async def bulk_create_users(db: Session, users_data: List[UserCreate], batch_size: int = BULK_INSERT_BATCH_SIZE) -> dict:
+    errors, roles, pending = await run_in_threadpool(validate_bulk_users, db, users_data)
+    hashes = await hash_passwords_async([user_data.password for _, user_data in pending])
+
+    now = datetime.now(UTC)
+    rows = []
+    for (index, user_data), password_hash in zip(pending, hashes):
+        row = user_data.model_dump(exclude={'password'})
+        row.update(password_hash=password_hash, is_active=True, created_at=now, updated_at=now)
+        rows.append((index, row))
+
+    created = await run_in_threadpool(insert_user_rows, db, rows, roles, errors, batch_size)
+    return {
+        "created": [
+            {"index": index, "id": user_id, "username": row["username"]}
+            for index, user_id, row in created
+        ],
+        "errors": [
+            {"index": index, "detail": detail}
+            for index, detail in sorted(errors.items())
+        ]
+    }
+
 def update_user(db: Session, user_id: int, user_data: UserUpdate) -> User:
     db_user = get_user(db, user_id)
     if not db_user:
@@ -90,7 +265,7 @@ def update_user(db: Session, user_id: int, user_data: UserUpdate) -> User:
             detail="User not found"
         )
     
-    check_last_admin(db, user_id)
+    check_last_admin(db, user_id, db_user)
     
     try:
         update_data = user_data.model_dump(exlude_unset=True)
@@ -103,7 +278,9 @@ def update_user(db: Session, user_id: int, user_data: UserUpdate) -> User:
                 
             db_user.update_at = datetime.now(UTC)
             db.commit()
+            invalidate_user_tokens(user_id)
             db.refresh(db_user)
+            index_user(db_user)
             
             return db_user
         
@@ -120,63 +297,65 @@ def update_user(db: Session, user_id: int, user_data: UserUpdate) -> User:
             detail="Internal server error during user update."
         )
 
-def update_user_password(db: Session, user_id: int, current_password: str, new_password: str) -> bool:
-    db_user = get_user(db, user_id)
+async def update_user_password(db: Session, user_id: int, current_password: str, new_password: str) -> bool:
+    db_user = await run_in_threadpool(get_user, db, user_id)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    if not verify_password(current_password, db_user.password_hash):
+    if not await verify_password_async(current_password, db_user.password_hash):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Current password is incorrect")
     
-    db_user.password_hash = get_password_hash(new_password)
-    db_user.updated_at = datetime.now(UTC)
-    
+    values = {"password_hash": await hash_password_async(new_password), "updated_at": datetime.now(UTC)}
+    await run_in_threadpool(store_password_hash, db, user_id, values, db_user.password_hash)
+    return True
+
+def store_password_hash(db: Session, user_id: int, values: dict, previous_hash: str) -> None:
     try:
-        db.commit()
-        return True
+        updated = update_returning(db, User, user_id, values, User.password_hash == previous_hash)
     except Exception:
-        db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update password")
+    
+    require_updated(db, User, user_id, updated, "User")
+    invalidate_user_tokens(user_id)
 def deactivate_user(db: Session, user_id: int) -> User:
     db_user = get_user(db, user_id)
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    check_last_admin(db, user_id)
+    check_last_admin(db, user_id, db_user)
     
-    db_user.is_active = False
-    db_user.updated_at = datetime.now(UTC)
-    
-    try:
-        db.commit()
-        db.refresh(db_user)
-        return db_user
-    except Exception:
-        db.rollback()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to deactivate user")
+    return set_user_active(db, user_id, False)
         
 def activate_user(db: Session, user_id: int) -> User:
-    db_user = get_user(db, user_id)
-    if not db_user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return set_user_active(db, user_id, True)
+
+def set_user_active(db: Session, user_id: int, is_active: bool) -> User:
+    values = {"is_active": is_active, "updated_at": datetime.now(UTC)}
     
-    db_user.is_active = True
-    db_user.updated_at = datetime.now(UTC)
+    try:
+        db_user = update_returning(db, User, user_id, values, User.is_active != is_active)
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to activate user" if is_active else "Failed to deactivate user"
+        )
     
-    try: 
-        db.commit()
-        db.refresh(db_user)
+    if db_user is None:
+        db_user = get_user(db, user_id)
+        if not db_user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         return db_user
-    except Exception:
-        db.rollback()
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="failed to activate user")
+    
+    invalidate_user_tokens(user_id)
+    user_statistics.activation_changed(not is_active, is_active)
+    return db_user
     
 def delete_user(db: Session, user_id: int) -> bool:
     db_user = get_user(db, user_id)
     if not db_user: 
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
-    check_last_admin(db, user_id)
+    check_last_admin(db, user_id, db_user)
     
     return deactivate_user(db, user_id) is not None
 
@@ -185,88 +364,106 @@ def change_user_role(db: Session, user_id: int, new_role_id: int) -> User:
     if not db_user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     
-    if db_user.role and db_user.role.name == "admin" and new_role_id.name != "admin":
-        check_last_admin(db, user_id)
+    new_role = role_registry.get(db, new_role_id)
+    if not new_role:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid role ID")
+    
+    old_role = role_registry.get(db, db_user.role_id)
+    old_role_name = old_role.name if old_role else None
+    if old_role_name == "admin" and new_role.name != "admin":
+        check_last_admin(db, user_id, db_user)
         
     db_user.role_id = new_role_id
     db_user.update_at = datetime.now(UTC)
     
     try:
         db.commit()
+        invalidate_user_tokens(user_id)
+        user_statistics.role_changed(old_role_name, new_role.name)
         db.refresh(db_user)
         return db_user
     except Exception:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail= "Failed to change user role")
         
+@read_only
 def get_user_statistics(db: Session) -> dict:
-    total_users = db.query(User).count()
-    active_users = db.query(User).filter(User.is_active == True).count()
-    inactive_users = total_users - active_users
+    if user_statistics.is_stale:
+        user_statistics.reconcile(db)
+    return user_statistics.as_dict()
     
-    role_stats = db.query(
-        Role.name,
-        db.func.count(User.id).label('count')
-    ).outerjoin(User).group_by(Role.name).all()
-
-    role_distribution = {role_name: count for role_name, count in role_stats}
-    
-    return {
-        "total_users": total_users,
-        "active_users": active_users,
-        "inactive_users": inactive_users,
-        "role_distribution": role_distribution
-    }
-    
-def search_users(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[User]:
-    search_query = f"%[query]%"
-    return db.query(User).filter(
+def search_user_filter(query: str):
+    search_query = f"%{query}%"
+    return (
         (User.username.ilike(search_query)) |
         (User.email.ilike(search_query)) |
         (User.first_name.ilike(search_query)) |
         (User.last_name.ilike(search_query))
-    ).offset(skip).limit(limit).all()
+    )
+
+@read_only
+def search_users(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[User]:
+    return search_users_ranked(db, query, skip=skip, limit=limit)
+
+@read_only
+def search_users_page(db: Session, query: str, cursor: Optional[str] = None, limit: int = 100, order_by: str = "id") -> dict:
+    search = db.query(User).filter(search_user_filter(query))
+    return keyset_paginate(search, get_page_columns(order_by), cursor, limit)
+
+def user_with_role_info(user: User) -> dict:
+    role = role_registry.peek(user.role_id)
+    role_info = {
+        "id": role.id,
+        "name": role.name,
+        "description": role.description
+    } if role else None
     
-def get_users_with_role_info(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
-    users = db.query(User).options(joinedload(User.role)).offset(skip).limit(limit).all()
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "is_active": user.is_active,
+        "last_login": user.last_login,
+        "created_at": user.created_at,
+        "role": role_info
+    }
     
-    result = []
-    for user in users:
-        role_info = {
-            "id": user.role.id,
-            "name": user.role.name,
-            "description": user.role.description
-        } if user.role else None
-        
-        user_dict = {
-            "id": user.id,
-            "username": user.username,
-            "email": user.first_name,
-            "last_name": user.last_name,
-            "is_active": user.is_active,
-            "last_login": user.last_login,
-            "created_at": user.created_at,
-            "role": role_info
-        }
-        result.append(user_dict)
-
-def validate_user_credentials(db: Session, username: str, password: str) -> Optional[User]:
-    user = get_user_by_username(db, username)
+@read_only
+def get_users_with_role_info(db: Session, skip: int = 0, limit: int = 100) -> List[dict]:
+    role_registry.ensure_current(db)
+    users = db.query(User).order_by(User.id).offset(skip).limit(limit).all()
+    return [user_with_role_info(user) for user in users]
+
+@read_only
+def get_users_with_role_info_page(db: Session, cursor: Optional[str] = None, limit: int = 100, order_by: str = "id") -> dict:
+    role_registry.ensure_current(db)
+    query = db.query(User)
+    page = keyset_paginate(query, get_page_columns(order_by), cursor, limit)
+    page["items"] = [user_with_role_info(user) for user in page["items"]]
+    return page
+
+async def validate_user_credentials(db: Session, username: str, password: str) -> Optional[User]:
+    user = await run_in_threadpool(get_user_by_username, db, username)
     if not user or not user.is_active:
         return None
     
-    if verify_password(password, user.password_hash):
+    if await verify_password_async(password, user.password_hash):
         return user
 
     return None
 
-def update_last_login(db: Session, user_id: int) -> User:
-    db_user = get_user(db, user_id)
-    if not db_user:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+def stamp_last_login(db: Session, db_user: User) -> User:
+    now = datetime.now(UTC)
     
-    db_user.last_login = datetime.now(UTC)
-    db_user.updated_at = datetime.now(UTC)
+    if activity_buffer.enabled:
+        activity_buffer.record_login(db_user.id, now)
+        set_committed_value(db_user, "last_login", now)
+        return db_user
+    
+    db_user.last_login = now
+    db_user.updated_at = now
     
     try:
         db.commit()
@@ -276,6 +473,54 @@ def update_last_login(db: Session, user_id: int) -> User:
         db.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update last login")
 
+def find_session_id(db: Session, token: str) -> Optional[int]:
+    from app.models import UserSession
+
+    return db.execute(
+        select(UserSession.id).where(UserSession.session_token == token, UserSession.is_active == True)
+    ).scalar()
+
+def touch_session_activity(db: Session, session_id: Optional[int]) -> None:
+    if session_id is None:
+        return
+    now = datetime.now(UTC)
+
+    if activity_buffer.enabled:
+        activity_buffer.record_activity(session_id, now)
+        return
+
+    from app.models import UserSession
+
+    try:
+        db.execute(update(UserSession).where(UserSession.id == session_id).values(last_activity=now))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update session activity")
+
+async def touch_session_activity_async(db: AsyncSession, session_id: Optional[int]) -> None:
+    if session_id is not None and activity_buffer.enabled:
+        activity_buffer.record_activity(session_id, datetime.now(UTC))
+    elif session_id is not None:
+        await db.run_sync(touch_session_activity, session_id)
+
+def update_last_login(db: Session, user_id: int) -> User:
+    if not activity_buffer.enabled:
+        now = datetime.now(UTC)
+        try:
+            db_user = update_returning(db, User, user_id, {"last_login": now, "updated_at": now})
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update last login")
+        if db_user is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+        return db_user
+    
+    db_user = get_user(db, user_id)
+    if not db_user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    
+    return stamp_last_login(db, db_user)
+
 def update_new_project(db:Session, user_id: int) -> User:
     db_user = get_user(db, user_id)
     if not db_user:
@@ -0,0 +1,136 @@
+import logging
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 5
+STARTUP_SCHEMA_MODE = os.getenv("STARTUP_SCHEMA_MODE", "check").lower()
+
+if STARTUP_SCHEMA_MODE not in ("check", "create", "skip"):
+    raise ValueError("STARTUP_SCHEMA_MODE must be one of: check, create, skip")
+
+
+class StartupReport:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: List[Dict] = []
+        self.schema_action: Optional[str] = None
+        self.models_preloaded: Optional[bool] = None
+        self.completed: Optional[float] = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append({"phase": name, "ms": round((time.perf_counter() - started) * 1000, 3)})
+
+    def mark(self, name: str) -> None:
+        self.phases.append({"phase": name, "ms": round((time.perf_counter() - self.started) * 1000, 3)})
+
+    def finish(self) -> None:
+        self.completed = time.perf_counter()
+        logger.info("Startup finished in %.1f ms: %s", self.total_ms, self.phases)
+
+    @property
+    def total_ms(self) -> float:
+        end = self.completed if self.completed is not None else time.perf_counter()
+        return round((end - self.started) * 1000, 3)
+
+    def as_dict(self) -> dict:
+        return {
+            "total_ms": self.total_ms,
+            "schema_mode": STARTUP_SCHEMA_MODE,
+            "schema_action": self.schema_action,
+            "models_preloaded": self.models_preloaded,
+            "phases": self.phases,
+        }
+
+
+startup_report = StartupReport()
+
+# Column changes create_all cannot make on existing tables, keyed by the
+# version that introduced them. Each statement must be safe to re-run.
+SCHEMA_UPGRADES = {
+    5: {
+        "postgresql": [
+            "ALTER TABLE exchange_rates ALTER COLUMN rate TYPE NUMERIC(18, 6)",
+            "ALTER TABLE financial_transaction ALTER COLUMN exchange_rate TYPE NUMERIC(18, 6)",
+        ],
+    },
+}
+
+
+def get_schema_version(engine) -> Optional[int]:
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def stamp_schema_version(engine, version: int = SCHEMA_VERSION) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+        if conn.execute(text("UPDATE schema_version SET version = :version"), {"version": version}).rowcount == 0:
+            conn.execute(text("INSERT INTO schema_version (version) VALUES (:version)"), {"version": version})
+
+
+def upgrade_schema(engine, version: Optional[int]) -> None:
+    with engine.begin() as conn:
+        for target, statements in sorted(SCHEMA_UPGRADES.items()):
+            if version is not None and version >= target:
+                continue
+            for statement in statements.get(engine.dialect.name, []):
+                conn.execute(text(statement))
+
+
+def create_schema(engine) -> None:
+    from app.db import base
+
+    version = get_schema_version(engine)
+    base.Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, indexes included.
+    for table in base.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    upgrade_schema(engine, version)
+    stamp_schema_version(engine)
+
+
+def ensure_schema(engine) -> str:
+    """
+    Bring the schema up to date according to ``STARTUP_SCHEMA_MODE``:
+
+    - ``check`` (default): read one row from ``schema_version`` and only
+      run DDL when it is missing or behind. This saves the DDL round
+      trips, not the model import: the routers import ``app.models``
+      before startup, which ``models_preloaded`` in the report records.
+    - ``create``: always run ``create_all`` like earlier releases did.
+    - ``skip``: touch nothing; migrations are applied out of band.
+    """
+    startup_report.models_preloaded = "app.models" in sys.modules or "app.models.user" in sys.modules
+    if STARTUP_SCHEMA_MODE == "skip":
+        action = "skipped"
+    elif STARTUP_SCHEMA_MODE == "create":
+        create_schema(engine)
+        action = "created"
+    else:
+        version = get_schema_version(engine)
+        if version is not None and version >= SCHEMA_VERSION:
+            action = "current"
+        else:
+            logger.info("Schema version %s is behind %s; running DDL", version, SCHEMA_VERSION)
+            create_schema(engine)
+            action = "created"
+
+    startup_report.schema_action = action
+    return action
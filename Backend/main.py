@@ -1,10 +1,14 @@
+from app.startup import startup_report, ensure_schema
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import auth, workflow
 from app.db.session import engine
-from app.db import base
+from app.services.hashing_service import hashing_service
+from app.database import dispose_async_engine, get_db_context, get_pool_stats
+from app.services.activity_buffer import activity_buffer
+from api.query_middleware import instrument_queries, get_query_metrics
 
-base.Base.metadata.create_all(bind=engine)
+startup_report.mark("imports")
 
 app = FastAPI(
     title="Integrated ERP System API",
@@ -20,11 +24,51 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+app.middleware("http")(instrument_queries)
+
 app.include_router(auth.router, prefix="/api", tags=["Authentication"])
 app.include_router(workflow.router, prefix="/api", tags=["Workflow & Data"])
 
+@app.on_event("startup")
+def prepare_schema():
+    with startup_report.phase("schema"):
+        ensure_schema(engine)
+
+@app.on_event("startup")
+def load_role_registry():
+    from app.services.role_registry import role_registry
+    
+    with startup_report.phase("role_registry"):
+        with get_db_context() as db:
+            role_registry.load(db)
+    startup_report.finish()
+
+@app.on_event("shutdown")
+def shutdown_hashing_pool():
+    hashing_service.shutdown()
+
+@app.on_event("shutdown")
+def flush_activity_buffer():
+    activity_buffer.stop()
+
+@app.on_event("shutdown")
+async def shutdown_async_engine():
+    await dispose_async_engine()
+
 @app.get("/", tags=["Health Check"])
 def read_root():
     return {"status": "ERP Backend is running successfully"}
 
+@app.get("/health/db", tags=["Health Check"])
+def read_pool_stats():
+    return get_pool_stats()
+
+@app.get("/health/startup", tags=["Health Check"])
+def read_startup_report():
+    return startup_report.as_dict()
+
+@app.get("/metrics/db", tags=["Health Check"])
+def read_query_metrics():
+    return {"pool": get_pool_stats(), "routes": get_query_metrics()}
+
 @app.get("/ "), tags=[Invnto]
\ No newline at end of file
@@ -0,0 +1,123 @@
+"""
+Benchmark the AR aging engine on a synthetic ledger: one set-based query
+for all agencies vs one query per agency, a cached read, and the
+incremental refresh after a single agency is invalidated.
+
+    python scripts/bench_ar_aging.py --rows 1000000 --agencies 200
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from app.services.ar_aging_service import ARAgingCache, compute_ar_aging
+
+STATUSES = ["pending", "issued", "partially_paid", "overdue", "paid", "paid", "paid", "cancelled"]
+TYPES = ["invoice", "invoice", "invoice", "payment", "credit_note"]
+
+LEDGER_DDL = """
+CREATE TABLE financial_transaction (
+    id INTEGER PRIMARY KEY,
+    agency_id INTEGER,
+    transaction_type VARCHAR(30) NOT NULL,
+    status VARCHAR(20),
+    amount_local NUMERIC(15, 2),
+    due_date DATE,
+    payment_date DATE,
+    created_at TIMESTAMP
+)
+"""
+
+
+def load_ledger(engine, rows: int, agencies: int, as_of: date, seed: int = 42, batch_size: int = 50000):
+    rng = random.Random(seed)
+    insert = text(
+        "INSERT INTO financial_transaction "
+        "(id, agency_id, transaction_type, status, amount_local, due_date, payment_date, created_at) "
+        "VALUES (:id, :agency_id, :transaction_type, :status, :amount_local, :due_date, :payment_date, :created_at)"
+    )
+    with engine.begin() as conn:
+        conn.execute(text(LEDGER_DDL))
+        batch = []
+        for transaction_id in range(1, rows + 1):
+            created = as_of - timedelta(days=rng.randint(0, 365))
+            due = created + timedelta(days=rng.choice([14, 30, 45, 60]))
+            status = rng.choice(STATUSES)
+            paid = due + timedelta(days=rng.randint(-10, 120)) if status == "paid" else None
+            batch.append({
+                "id": transaction_id,
+                "agency_id": rng.randint(1, agencies),
+                "transaction_type": rng.choice(TYPES),
+                "status": status,
+                "amount_local": f"{rng.randint(100_000, 500_000_000) / 100:.2f}",
+                "due_date": due,
+                "payment_date": paid,
+                "created_at": created,
+            })
+            if len(batch) >= batch_size:
+                conn.execute(insert, batch)
+                batch = []
+        if batch:
+            conn.execute(insert, batch)
+        conn.execute(text(
+            "CREATE INDEX idx_bench_ledger_aging ON financial_transaction "
+            "(transaction_type, status, agency_id, due_date)"
+        ))
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--agencies", type=int, default=200)
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date(2025, 6, 30))
+    parser.add_argument("--database-url", default=None, help="defaults to a temporary SQLite file")
+    args = parser.parse_args()
+
+    workdir = None
+    url = args.database_url
+    if url is None:
+        workdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(workdir.name, 'ledger.db')}"
+
+    engine = create_engine(url)
+    _, load_ms = timed(lambda: load_ledger(engine, args.rows, args.agencies, args.as_of))
+    print(f"loaded {args.rows} transactions for {args.agencies} agencies in {load_ms:.0f} ms")
+
+    with Session(engine) as db:
+        report, set_ms = timed(lambda: compute_ar_aging(db, args.as_of))
+        _, per_agency_ms = timed(lambda: [compute_ar_aging(db, args.as_of, [agency]) for agency in report])
+
+        cache = ARAgingCache(max_dates=4, ttl=3600)
+        _, cold_ms = timed(lambda: cache.get(db, args.as_of))
+        _, warm_ms = timed(lambda: cache.get(db, args.as_of))
+        cache.invalidate_agencies({next(iter(report))})
+        refreshed, incremental_ms = timed(lambda: cache.get(db, args.as_of))
+        assert refreshed == report
+
+    print(f"{'set-based query':<28} {set_ms:>10.1f} ms")
+    print(f"{'one query per agency':<28} {per_agency_ms:>10.1f} ms")
+    print(f"{'cache cold':<28} {cold_ms:>10.1f} ms")
+    print(f"{'cache warm':<28} {warm_ms:>10.3f} ms")
+    print(f"{'one agency invalidated':<28} {incremental_ms:>10.1f} ms")
+
+    engine.dispose()
+    if workdir is not None:
+        workdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark the in-process n-gram user search against a linear substring
+scan (what ILIKE '%...%' does without a trigram index) as the user table
+grows.
+
+    python scripts/bench_user_search.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.search_service import NgramIndex
+
+FIRST_NAMES = ["budi", "siti", "agus", "dewi", "rizky", "putri", "andi", "ratna", "joko", "wulan"]
+LAST_NAMES = ["santoso", "wijaya", "saputra", "hidayat", "pratama", "sidabutar", "nasution", "siregar"]
+
+
+def make_rows(count: int, seed: int = 42):
+    rng = random.Random(seed)
+    rows = []
+    for user_id in range(1, count + 1):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        suffix = "".join(rng.choices(string.ascii_lowercase + string.digits, k=6))
+        username = f"{first}.{last}.{suffix}"
+        rows.append((user_id, username, f"{username}@ginko.co.id", first.title(), last.title()))
+    return rows
+
+
+def linear_scan(rows, query: str, limit: int):
+    needle = query.lower()
+    return [row[0] for row in rows if any(needle in value.lower() for value in row[1:])][:limit]
+
+
+def time_queries(func, queries, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for query in queries:
+            func(query)
+    return (time.perf_counter() - started) / (repeat * len(queries)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    queries = ["sidab", "wijaya", "putri.pr", "ginko", "x9q"]
+
+    print(f"{'users':>10} {'build ms':>10} {'ngram ms':>10} {'scan ms':>10} {'speedup':>8}")
+    for size in args.sizes:
+        rows = make_rows(size)
+
+        index = NgramIndex()
+        started = time.perf_counter()
+        index.build(rows)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        ngram_ms = time_queries(lambda q: index.search(q, limit=args.limit), queries, args.repeat)
+        scan_ms = time_queries(lambda q: linear_scan(rows, q, args.limit), queries, args.repeat)
+        print(f"{size:>10} {build_ms:>10.1f} {ngram_ms:>10.3f} {scan_ms:>10.3f} {scan_ms / ngram_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Export the financial transaction ledger to CSV and/or Parquet, streaming
+from a server-side cursor in fixed-size chunks.
+
+    python scripts/export_ledger.py --date-from 2024-01-01 --date-to 2025-01-01 --csv ledger.csv --parquet ledger.parquet
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import get_db_context
+from app.services.export_service import (
+    LEDGER_EXPORT_CHUNK_SIZE, ledger_arrow_schema, ledger_export_statement, write_ledger_csv, write_ledger_parquet
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--date-from", type=date.fromisoformat, default=None)
+    parser.add_argument("--date-to", type=date.fromisoformat, default=None, help="exclusive")
+    parser.add_argument("--agency-id", type=int, default=None)
+    parser.add_argument("--status", dest="statuses", nargs="+", default=None)
+    parser.add_argument("--csv", dest="csv_path", default=None)
+    parser.add_argument("--parquet", dest="parquet_path", default=None)
+    parser.add_argument("--compression", default="zstd")
+    parser.add_argument("--chunk-size", type=int, default=LEDGER_EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    if not args.csv_path and not args.parquet_path:
+        parser.error("pass --csv and/or --parquet")
+    if args.parquet_path:
+        try:
+            ledger_arrow_schema()
+        except RuntimeError as exc:
+            parser.error(str(exc))
+
+    statement = ledger_export_statement(args.date_from, args.date_to, args.agency_id, args.statuses)
+
+    with get_db_context() as db:
+        if args.csv_path:
+            started = time.perf_counter()
+            write_ledger_csv(db, statement, args.csv_path, args.chunk_size)
+            print(f"wrote {args.csv_path} in {time.perf_counter() - started:.2f}s")
+        if args.parquet_path:
+            started = time.perf_counter()
+            rows = write_ledger_parquet(db, statement, args.parquet_path, args.chunk_size, args.compression)
+            print(f"wrote {rows} rows to {args.parquet_path} in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Raise invoices for a set of shipments and/or every shipment of a set of
+contracts in one transaction. Already-invoiced shipments are skipped.
+
+    python scripts/generate_invoices.py --contract 12 13 --tax-rate 11
+"""
+import argparse
+import os
+import sys
+from datetime import date
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import get_db_context
+from app.services.invoice_service import generate_invoices
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--shipment", dest="shipment_ids", type=int, nargs="+", default=[])
+    parser.add_argument("--contract", dest="contract_ids", type=int, nargs="+", default=[])
+    parser.add_argument("--tax-rate", type=Decimal, default=Decimal("0"), help="percent")
+    parser.add_argument("--discount-rate", type=Decimal, default=Decimal("0"), help="percent")
+    parser.add_argument("--invoice-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--user-id", type=int, default=None)
+    args = parser.parse_args()
+
+    with get_db_context() as db:
+        result = generate_invoices(
+            db,
+            shipment_ids=args.shipment_ids,
+            contract_ids=args.contract_ids,
+            tax_rate=args.tax_rate,
+            discount_rate=args.discount_rate,
+            invoice_date=args.invoice_date,
+            user_id=args.user_id
+        )
+    print(f"created {len(result['created'])}, skipped {len(result['skipped'])}")
+    for item in result["skipped"]:
+        print(f"  shipment {item['shipment_id']}: {item['detail']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Flip pending/issued transactions past their due date to ``overdue`` and
+record a reminder for each, one committed chunk at a time.
+
+    python scripts/mark_overdue_transactions.py --as-of 2024-12-31 --chunk-size 1000
+"""
+import argparse
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import get_db_context
+from app.services.overdue_service import OVERDUE_CHUNK_SIZE, mark_overdue_transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--as-of", type=date.fromisoformat, default=None)
+    parser.add_argument("--chunk-size", type=int, default=OVERDUE_CHUNK_SIZE)
+    parser.add_argument("--max-chunks", type=int, default=None)
+    parser.add_argument("--user-id", type=int, default=None, help="user recorded on the workflow history rows")
+    args = parser.parse_args()
+
+    with get_db_context() as db:
+        result = mark_overdue_transactions(
+            db,
+            as_of=args.as_of,
+            chunk_size=args.chunk_size,
+            user_id=args.user_id,
+            max_chunks=args.max_chunks
+        )
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""
+Rebuild ``financial_rollups`` from ``financial_transaction`` in one
+INSERT ... SELECT. Run after bulk loads that bypassed the ORM, or to
+repair drift.
+
+    python scripts/rebuild_financial_rollups.py
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import get_db_context
+from app.services.finance_rollup_service import rebuild_financial_rollups, get_financial_statistics
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--show", action="store_true", help="print dashboard statistics after the rebuild")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with get_db_context() as db:
+        rows = rebuild_financial_rollups(db)
+        print(f"rebuilt {rows} rollup rows in {(time.perf_counter() - started) * 1000:.1f} ms")
+        if args.show:
+            print(get_financial_statistics(db).model_dump())
+
+
+if __name__ == "__main__":
+    main()
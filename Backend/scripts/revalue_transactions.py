@@ -0,0 +1,44 @@
+"""
+Recompute base-currency amounts for financial transactions from the
+exchange-rate table, e.g. a month-end revaluation at one day's rates.
+
+    python scripts/revalue_transactions.py --rate-date 2024-12-31 --period-from 2024-12-01 --period-to 2025-01-01
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import get_db_context
+from app.services.revaluation_service import REVALUATION_CHUNK_SIZE, revalue_transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rate-date", type=date.fromisoformat, default=None)
+    parser.add_argument("--currency", default=None)
+    parser.add_argument("--period-from", type=date.fromisoformat, default=None)
+    parser.add_argument("--period-to", type=date.fromisoformat, default=None)
+    parser.add_argument("--status", dest="statuses", nargs="+", default=None)
+    parser.add_argument("--chunk-size", type=int, default=REVALUATION_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with get_db_context() as db:
+        result = revalue_transactions(
+            db,
+            rate_date=args.rate_date,
+            currency=args.currency,
+            period_from=args.period_from,
+            period_to=args.period_to,
+            statuses=args.statuses,
+            chunk_size=args.chunk_size
+        )
+    print(result, f"{time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
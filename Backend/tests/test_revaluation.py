@@ -0,0 +1,89 @@
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+from app.services.revaluation_service import RevaluationBatch, div_round
+
+CENT = Decimal("0.01")
+
+
+def reference(amount: Decimal, rate: Decimal, tax_rate: Decimal, discount: Decimal):
+    amount_local = (amount * rate).quantize(CENT, rounding=ROUND_HALF_UP)
+    tax_amount = (amount_local * tax_rate / 100).quantize(CENT, rounding=ROUND_HALF_UP)
+    return amount_local, tax_amount, amount_local + tax_amount - discount
+
+
+def row(position: int, amount: Decimal, tax_rate: Decimal, discount: Decimal, **stored) -> dict:
+    return dict({
+        "id": position + 1,
+        "amount": amount,
+        "tax_rate": tax_rate,
+        "discount_amount": discount,
+        "exchange_rate": None,
+        "amount_local": None,
+        "tax_amount": None,
+        "total_amount": None,
+        "currency": "USD",
+        "created_at": None,
+    }, **stored)
+
+
+@pytest.mark.parametrize("numerator, denominator", [
+    (5, 10), (-5, 10), (4, 10), (-4, 10), (15, 10), (-15, 10), (0, 7), (1, 3), (-2, 3), (10 ** 18 + 1, 2),
+])
+def test_div_round_matches_round_half_up(numerator, denominator):
+    expected = (Decimal(numerator) / Decimal(denominator)).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+    assert div_round(numerator, denominator) == int(expected)
+
+
+def test_compute_matches_decimal_per_row():
+    rng = random.Random(7)
+    cases = [
+        (Decimal("0.05"), Decimal("0.500000"), Decimal("0"), Decimal("0")),
+        (Decimal("-0.05"), Decimal("0.500000"), Decimal("0"), Decimal("0")),
+        (Decimal("-1234.57"), Decimal("15873.123457"), Decimal("11.00"), Decimal("0")),
+        (Decimal("-0.01"), Decimal("1.500000"), Decimal("12.50"), Decimal("0.01")),
+    ]
+    for _ in range(500):
+        cases.append((
+            Decimal(rng.randint(-10 ** 9, 10 ** 9)).scaleb(-2),
+            Decimal(rng.randint(1, 10 ** 10)).scaleb(-6),
+            Decimal(rng.randint(0, 2500)).scaleb(-2),
+            Decimal(rng.randint(0, 10 ** 5)).scaleb(-2),
+        ))
+
+    batch = RevaluationBatch([row(i, amount, tax, discount) for i, (amount, _, tax, discount) in enumerate(cases)])
+    for position, (_, rate, _, _) in enumerate(cases):
+        batch.rate[position] = int(rate.scaleb(6))
+    batch.compute()
+    changes = {change["position"]: change for change in batch.changes()}
+
+    for position, (amount, rate, tax, discount) in enumerate(cases):
+        amount_local, tax_amount, total_amount = reference(amount, rate, tax, discount)
+        change = changes[position]
+        assert change["exchange_rate"] == rate
+        assert change["amount_local"] == amount_local
+        assert change["tax_amount"] == tax_amount
+        assert change["total_amount"] == total_amount
+
+
+def test_changes_skips_unchanged_and_missing_rows():
+    amount, rate, tax, discount = Decimal("-250.25"), Decimal("16000.000000"), Decimal("11.00"), Decimal("5.00")
+    amount_local, tax_amount, total_amount = reference(amount, rate, tax, discount)
+    rows = [
+        row(0, amount, tax, discount, exchange_rate=rate, amount_local=amount_local,
+            tax_amount=tax_amount, total_amount=total_amount),
+        row(1, amount, tax, discount, exchange_rate=rate, amount_local=amount_local + CENT,
+            tax_amount=tax_amount, total_amount=total_amount),
+        row(2, amount, tax, discount),
+    ]
+    batch = RevaluationBatch(rows)
+    for position in range(len(rows)):
+        batch.rate[position] = int(rate.scaleb(6))
+    batch.compute()
+
+    changed = batch.changes(skip=[2])
+    assert [change["position"] for change in changed] == [1]
+    assert changed[0]["b_id"] == 2
+    assert changed[0]["amount_local"] == amount_local
@@ -0,0 +1,9 @@
+CREATE TABLE exchange_rates (
+    id SERIAL PRIMARY KEY,
+    currency VARCHAR(3) NOT NULL,
+    rate_date DATE NOT NULL,
+    rate DECIMAL(18,6) NOT NULL CHECK (rate > 0),
+    source VARCHAR(50),
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_exchange_rate_currency_date UNIQUE (currency, rate_date)
+);
@@ -0,0 +1,14 @@
+CREATE TABLE financial_rollups (
+    id SERIAL PRIMARY KEY,
+    agency_id INTEGER NOT NULL DEFAULT 0,
+    currency VARCHAR(3) NOT NULL,
+    transaction_type VARCHAR(30) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    period DATE NOT NULL,
+    transaction_count INTEGER NOT NULL DEFAULT 0,
+    amount_total DECIMAL(18,2) NOT NULL DEFAULT 0.00,
+    amount_local_total DECIMAL(18,2) NOT NULL DEFAULT 0.00,
+    total_amount_total DECIMAL(18,2) NOT NULL DEFAULT 0.00,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT uq_financial_rollup_key UNIQUE (agency_id, currency, transaction_type, status, period)
+);
\ No newline at end of file
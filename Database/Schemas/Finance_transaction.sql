@@ -8,7 +8,7 @@ CREATE TABLE financial_transactions (
     invoice_id INTEGER,
     amount DECIMAL (15,2) NOT NULL,
     currency VARCHAR(3) DEFAULT 'IDR',
-    exchange_rate DECIMAL(10,6) DEFAULT 1.000000,
+    exchange_rate DECIMAL(18,6) DEFAULT 1.000000,
     amount_local DECIMAL (15,2),
     due_date DATE,
     payment_date DATE,
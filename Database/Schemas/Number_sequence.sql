@@ -0,0 +1,11 @@
+-- Document numbers are reserved in blocks (NUMBER_BLOCK_SIZE, default 50).
+-- On PostgreSQL the service creates one sequence per entity and year on
+-- first use, e.g.:
+--   CREATE SEQUENCE IF NOT EXISTS doc_seq_invoice_2025 START WITH 1 INCREMENT BY 50;
+-- The table below is the fallback for databases without sequences.
+CREATE TABLE document_counters (
+    entity VARCHAR(30) NOT NULL,
+    year INTEGER NOT NULL,
+    next_value INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (entity, year)
+);
@@ -15,4 +15,7 @@ CREATE INDEX idx_financial_transactions_transaction_type ON financial_transactio
 CREATE INDEX idx_workflow_history_entity ON workflow_history(entity_type, entity_id);
 CREATE INDEX idx_workflow_history_user ON workflow_history(user_id);
 CREATE INDEX idx_notifications_user_id ON notifications(user_id);
-CREATE INDEX idx_notifications_is_read ON notifications(is_read);
\ No newline at end of file
+CREATE INDEX idx_notifications_is_read ON notifications(is_read);
+CREATE INDEX idx_users_active_role_id ON users(role_id, id) WHERE is_active;
+CREATE INDEX idx_financial_transactions_overdue_sweep ON financial_transactions(id, due_date) WHERE status IN ('pending', 'issued');
+CREATE UNIQUE INDEX uq_financial_transactions_shipment_invoice ON financial_transactions(shipment_id) WHERE transaction_type = 'invoice' AND status <> 'cancelled';
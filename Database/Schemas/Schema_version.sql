@@ -0,0 +1,5 @@
+CREATE TABLE schema_version (
+    version INTEGER NOT NULL
+);
+
+INSERT INTO schema_version (version) VALUES (5);
\ No newline at end of file
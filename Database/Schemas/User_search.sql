@@ -0,0 +1,6 @@
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX idx_users_username_trgm ON users USING GIN (username gin_trgm_ops);
+CREATE INDEX idx_users_email_trgm ON users USING GIN (email gin_trgm_ops);
+CREATE INDEX idx_users_first_name_trgm ON users USING GIN (first_name gin_trgm_ops);
+CREATE INDEX idx_users_last_name_trgm ON users USING GIN (last_name gin_trgm_ops);
\ No newline at end of file